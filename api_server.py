@@ -1,16 +1,22 @@
 import os
-from fastapi import FastAPI, HTTPException
+import json
+import uuid
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-from functions1.get_file_info import schema_get_files_info
-from functions1.get_file_content import schema_get_file_content
-from functions1.get_write_file_content import schema_write_file
-from functions1.run_python_file import schema_run_python_file
+from functions1.run_python_file import run_metrics
+from functions1.calculate import evaluate_expression, evaluate_batch
+from functions1.run_tests import forget as forget_tests
+import call_function as call_function_module
 from call_function import call_function
-from typing import List, Optional
+from workspaces import pool_from_env, WorkspaceError, QuotaExceeded
+from tracing import tracer_from_env
+from tool_selection import select_config
+from replay_cache import cache_from_env, wrap_client, working_directory as replay_working_directory
+from typing import Annotated, List, Optional
 
 load_dotenv()
 
@@ -25,40 +31,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Gemini client
+# Optional response cache in front of the model (AGENT_REPLAY_MODE=record|replay)
+replay_cache = cache_from_env()
+
+# Initialize Gemini client; replay mode runs fully offline and needs no key
 api_key = os.environ.get("GEMINI_API_KEY")
-if not api_key:
+offline = replay_cache is not None and replay_cache.mode == "replay"
+if not api_key and not offline:
     raise ValueError("GEMINI_API_KEY environment variable is not set")
 
-client = genai.Client(api_key=api_key)
+client = wrap_client(genai.Client(api_key=api_key) if api_key else None, replay_cache)
 
-system_prompt = """
-    You are a helpful AI coding agent.
+MODEL = "gemini-2.0-flash-001"
 
-    When a user asks a question or makes a request, make a function call plan. You can perform the following operations:
+# Per-session working directories (AGENT_WORKSPACE_TEMPLATE); None means every
+# request works in the server's current directory.
+workspace_pool = pool_from_env(on_release=forget_tests)
 
-    - List files and directories
-    - read content of the file
-    - write to a file
-    - run a python file with optional arguements
-    
+# Tools that can grow a workspace and so trigger a quota check.
+MUTATING_FUNCTIONS = {"write_file", "run_python_file", "run_tests"}
 
-    All paths you provide should be relative to the working directory. You do not need to specify the working directory in your function calls as it is automatically injected for security reasons.
-    """
+# Sampled span tracing of /chat (TRACE_SAMPLE_RATE, TRACE_EXPORT_PATH).
+tracer = tracer_from_env()
 
-available_functions = types.Tool(
-    function_declarations=[
-        schema_get_files_info,
-        schema_get_file_content,
-        schema_write_file,
-        schema_run_python_file
-    ]
-)
-
-config = types.GenerateContentConfig(
-    tools=[available_functions], 
-    system_instruction=system_prompt
-)
+# /calculate runs on the event loop, so request sizes are capped (422 above them).
+MAX_EXPRESSION_CHARS = 1000
+MAX_BATCH_EXPRESSIONS = 1000
 
 
 class ChatMessage(BaseModel):
@@ -69,6 +67,7 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     conversation_history: Optional[List[ChatMessage]] = []
+    session_id: Optional[str] = None
 
 
 class FunctionCallInfo(BaseModel):
@@ -81,6 +80,27 @@ class ChatResponse(BaseModel):
     response: str
     function_calls: List[FunctionCallInfo] = []
     usage_metadata: Optional[dict] = None
+    session_id: Optional[str] = None
+
+
+class CalculateRequest(BaseModel):
+    expression: str = Field(max_length=MAX_EXPRESSION_CHARS)
+
+
+class CalculateResponse(BaseModel):
+    expression: str
+    result: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BatchCalculateRequest(BaseModel):
+    expressions: List[Annotated[str, Field(max_length=MAX_EXPRESSION_CHARS)]] = Field(
+        max_length=MAX_BATCH_EXPRESSIONS
+    )
+
+
+class BatchCalculateResponse(BaseModel):
+    results: List[CalculateResponse]
 
 
 @app.get("/")
@@ -93,35 +113,130 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/prefetch/stats")
+def prefetch_stats():
+    if call_function_module.prefetcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **call_function_module.prefetcher.stats()}
+
+
+@app.get("/workspaces/stats")
+def workspace_stats():
+    if workspace_pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **workspace_pool.stats()}
+
+
+@app.delete("/sessions/{session_id}")
+def release_session(session_id: str):
+    if workspace_pool is None:
+        raise HTTPException(status_code=404, detail="Workspaces are not enabled")
+    try:
+        released = workspace_pool.release(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not released:
+        raise HTTPException(status_code=404, detail=f"No workspace for session {session_id}")
+    return {"released": session_id}
+
+
+@app.get("/debug/traces")
+def debug_traces(limit: int = Query(20, ge=1)):
+    return {"sample_rate": tracer.sample_rate, "traces": tracer.recent(limit)}
+
+
+@app.get("/metrics/runs")
+def run_python_file_metrics():
+    """Aggregated CPU, memory and wall time of run_python_file executions."""
+    return run_metrics.snapshot()
+
+
+@app.post("/calculate", response_model=CalculateResponse)
+async def calculate(request: CalculateRequest):
+    try:
+        result = evaluate_expression(request.expression)
+    except (ValueError, ZeroDivisionError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return CalculateResponse(expression=request.expression, result=result)
+
+
+@app.post("/calculate/batch", response_model=BatchCalculateResponse)
+async def calculate_batch(request: BatchCalculateRequest):
+    results = [
+        CalculateResponse(expression=expression, result=result, error=error)
+        for expression, (result, error) in zip(request.expressions, evaluate_batch(request.expressions))
+    ]
+    return BatchCalculateResponse(results=results)
+
+
+def generate(messages, trace, iteration, working_dir):
+    """Call the model inside a generate_content span."""
+    with trace.child("generate_content", iteration=iteration, contents=len(messages)) as span:
+        with replay_working_directory(working_dir):
+            response = client.models.generate_content(
+                model=MODEL,
+                contents=messages,
+                config=select_config(messages)
+            )
+        if span.recording and response is not None:
+            span.set("function_calls", len(response.function_calls or []))
+            if response.usage_metadata:
+                span.set("prompt_token_count", response.usage_metadata.prompt_token_count)
+                span.set("candidates_token_count", response.usage_metadata.candidates_token_count)
+        return response
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
+    with tracer.start_trace(
+        "chat",
+        message_chars=len(request.message),
+        history_length=len(request.conversation_history or []),
+    ) as trace:
+        return await run_chat(request, trace)
+
+
+async def run_chat(request: ChatRequest, trace):
+    session_id = request.session_id
+    ephemeral = False
+    working_dir = os.getcwd()
+    if workspace_pool is not None:
+        # Requests without a session get a workspace for this request only,
+        # recycled into the ready pool afterwards.
+        if not session_id:
+            session_id = uuid.uuid4().hex
+            ephemeral = True
+        try:
+            working_dir = workspace_pool.lease(session_id, ephemeral=ephemeral)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except WorkspaceError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+
     try:
         # Build messages from conversation history
-        messages = []
-        
-        # Add conversation history
-        for msg in request.conversation_history:
+        with trace.child("build_messages"):
+            messages = []
+
+            # Add conversation history
+            for msg in request.conversation_history:
+                messages.append(
+                    types.Content(
+                        role=msg.role,
+                        parts=[types.Part(text=msg.content)]
+                    )
+                )
+
+            # Add current user message
             messages.append(
                 types.Content(
-                    role=msg.role,
-                    parts=[types.Part(text=msg.content)]
+                    role="user",
+                    parts=[types.Part(text=request.message)]
                 )
             )
         
-        # Add current user message
-        messages.append(
-            types.Content(
-                role="user",
-                parts=[types.Part(text=request.message)]
-            )
-        )
-        
         # Generate response
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-001",
-            contents=messages,
-            config=config
-        )
+        response = generate(messages, trace, iteration=0, working_dir=working_dir)
         
         if response is None:
             raise HTTPException(status_code=500, detail="Failed to get response from AI")
@@ -139,8 +254,13 @@ async def chat(request: ChatRequest):
             if current_response.function_calls:
                 # Process all function calls
                 for function_call in current_response.function_calls:
-                    working_dir = os.getcwd()
-                    tool_response = call_function(function_call, working_dir, verbose=False)
+                    with trace.child("call_function", function=function_call.name) as span:
+                        tool_response = call_function(function_call, working_dir, verbose=False)
+                        if span.recording:
+                            span.set("args_size", len(json.dumps(function_call.args or {}, default=str)))
+                            span.set("result_size", len(str(tool_response.parts[0].function_response.response)))
+                    if workspace_pool is not None and function_call.name in MUTATING_FUNCTIONS:
+                        workspace_pool.check_quota(session_id)
                     
                     # Store function call info
                     func_args = {}
@@ -175,11 +295,7 @@ async def chat(request: ChatRequest):
                     messages.append(tool_response)
                 
                 # Get next response after function calls
-                current_response = client.models.generate_content(
-                    model="gemini-2.0-flash-001",
-                    contents=messages,
-                    config=config
-                )
+                current_response = generate(messages, trace, iteration=iteration, working_dir=working_dir)
                 
                 if current_response is None:
                     response_text = "Function calls executed successfully, but no final response was generated."
@@ -193,38 +309,50 @@ async def chat(request: ChatRequest):
                 break
         
         # Extract the final response text
-        if current_response and current_response.text:
-            response_text = current_response.text
-        elif function_calls_info:
-            # If we had function calls but no text, provide a summary
-            response_text = f"Executed {len(function_calls_info)} function call(s) successfully."
-        else:
-            response_text = "No response generated."
-        
-        # Extract usage metadata from the final response
-        usage_metadata = None
-        if current_response and current_response.usage_metadata:
-            usage_metadata = {
-                "prompt_token_count": current_response.usage_metadata.prompt_token_count,
-                "candidates_token_count": current_response.usage_metadata.candidates_token_count,
-                "total_token_count": current_response.usage_metadata.total_token_count
-            }
-        elif response.usage_metadata:
-            # Fallback to initial response metadata
-            usage_metadata = {
-                "prompt_token_count": response.usage_metadata.prompt_token_count,
-                "candidates_token_count": response.usage_metadata.candidates_token_count,
-                "total_token_count": response.usage_metadata.total_token_count
-            }
-        
-        return ChatResponse(
-            response=response_text,
-            function_calls=function_calls_info,
-            usage_metadata=usage_metadata
-        )
+        with trace.child("build_response", function_calls=len(function_calls_info)):
+            if current_response and current_response.text:
+                response_text = current_response.text
+            elif function_calls_info:
+                # If we had function calls but no text, provide a summary
+                response_text = f"Executed {len(function_calls_info)} function call(s) successfully."
+            else:
+                response_text = "No response generated."
+
+            # Extract usage metadata from the final response
+            usage_metadata = None
+            if current_response and current_response.usage_metadata:
+                usage_metadata = {
+                    "prompt_token_count": current_response.usage_metadata.prompt_token_count,
+                    "candidates_token_count": current_response.usage_metadata.candidates_token_count,
+                    "total_token_count": current_response.usage_metadata.total_token_count
+                }
+            elif response.usage_metadata:
+                # Fallback to initial response metadata
+                usage_metadata = {
+                    "prompt_token_count": response.usage_metadata.prompt_token_count,
+                    "candidates_token_count": response.usage_metadata.candidates_token_count,
+                    "total_token_count": response.usage_metadata.total_token_count
+                }
+
+            chat_response = ChatResponse(
+                response=response_text,
+                function_calls=function_calls_info,
+                usage_metadata=usage_metadata,
+                session_id=None if ephemeral else session_id
+            )
+            if usage_metadata:
+                trace.set("total_token_count", usage_metadata["total_token_count"])
+        return chat_response
         
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    finally:
+        if ephemeral:
+            workspace_pool.recycle(session_id)
 
 
 if __name__ == "__main__":
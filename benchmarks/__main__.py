@@ -0,0 +1,75 @@
+import argparse
+import sys
+from benchmarks import harness
+from benchmarks import bench_calculator, bench_tools, bench_dispatch, bench_chat  # noqa: F401 (registers benchmarks)
+
+
+def cmd_run(args):
+    results = harness.run(args.filter, repeat=args.repeat)
+    path = harness.save_results(results, args.save)
+    print(f"\nSaved results to {path}")
+    if args.compare:
+        baseline = harness.load_results(args.compare)
+        if args.filter:
+            baseline["benchmarks"] = {
+                name: stats for name, stats in baseline["benchmarks"].items() if args.filter in name
+            }
+        return report(baseline, results, args.threshold)
+    return 0
+
+
+def cmd_compare(args):
+    baseline = harness.load_results(args.baseline)
+    current = harness.load_results(args.current)
+    return report(baseline, current, args.threshold)
+
+
+def cmd_list(args):
+    for name in harness.registered(args.filter):
+        print(name)
+    return 0
+
+
+def report(baseline, current, threshold):
+    rows = harness.compare(baseline, current, threshold)
+    print(f"\n{'benchmark':<45} {'baseline':>12} {'current':>12} {'change':>8}  status")
+    for name, before, after, change, status in rows:
+        change_text = f"{change:+.1%}" if change is not None else "-"
+        print(f"{name:<45} {harness.format_seconds(before):>12} "
+              f"{harness.format_seconds(after):>12} {change_text:>8}  {status}")
+    regressions = [row for row in rows if row[4] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%}")
+        return 1
+    print(f"\nNo regressions beyond {threshold:.0%}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Project benchmark suite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run benchmarks and save the results as JSON")
+    run_parser.add_argument("--filter", help="only run benchmarks whose name contains this string")
+    run_parser.add_argument("--repeat", type=int, default=5, help="timing repeats per benchmark (default: 5)")
+    run_parser.add_argument("--save", default="latest", help="results name or .json path (default: latest)")
+    run_parser.add_argument("--compare", metavar="BASELINE", help="compare against this baseline after running")
+    run_parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold (default: 0.10)")
+    run_parser.set_defaults(func=cmd_run)
+
+    compare_parser = subparsers.add_parser("compare", help="compare two saved results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current", nargs="?", default="latest")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold (default: 0.10)")
+    compare_parser.set_defaults(func=cmd_compare)
+
+    list_parser = subparsers.add_parser("list", help="list benchmark names")
+    list_parser.add_argument("--filter")
+    list_parser.set_defaults(func=cmd_list)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import random
+from calculator.pkg.calculator import Calculator
+from benchmarks.harness import benchmark
+
+SHORT_EXPRESSION = "3 * (4 + 5) - 10 / 2 ^ 2"
+
+
+def long_expression(token_count=10_000, seed=0):
+    """Build a flat expression of roughly token_count number/operator tokens."""
+    rng = random.Random(seed)
+    parts = [str(rng.randint(1, 99))]
+    while len(parts) < token_count:
+        parts.append(rng.choice("+-*/"))
+        parts.append(str(rng.randint(1, 99)))
+    return " ".join(parts)
+
+
+LONG_EXPRESSION = long_expression()
+
+
+@benchmark("calculator.parse.short")
+def parse_short():
+    calculator = Calculator()
+    yield lambda: calculator.tokenize(SHORT_EXPRESSION)
+
+
+@benchmark("calculator.parse.10k_tokens")
+def parse_long():
+    calculator = Calculator()
+    yield lambda: calculator.tokenize(LONG_EXPRESSION)
+
+
+@benchmark("calculator.evaluate_tokens.short")
+def evaluate_tokens_short():
+    calculator = Calculator()
+    tokens = calculator.tokenize(SHORT_EXPRESSION)
+    yield lambda: calculator._evaluate_infix(tokens)
+
+
+@benchmark("calculator.evaluate_tokens.10k_tokens")
+def evaluate_tokens_long():
+    calculator = Calculator()
+    tokens = calculator.tokenize(LONG_EXPRESSION)
+    yield lambda: calculator._evaluate_infix(tokens)
+
+
+@benchmark("calculator.evaluate.short")
+def evaluate_short():
+    calculator = Calculator()
+    yield lambda: calculator.evaluate(SHORT_EXPRESSION)
+
+
+@benchmark("calculator.evaluate.10k_tokens")
+def evaluate_long():
+    calculator = Calculator()
+    yield lambda: calculator.evaluate(LONG_EXPRESSION)
@@ -0,0 +1,43 @@
+import os
+import shutil
+import tempfile
+from benchmarks.fake_model import FakeClient
+from benchmarks.bench_tools import make_tree
+from benchmarks.harness import benchmark
+
+
+def chat_client():
+    """Import api_server with an offline fake model and return (module, TestClient)."""
+    os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+    from fastapi.testclient import TestClient
+    import api_server
+    return api_server, TestClient(api_server.app)
+
+
+@benchmark("chat.text_only")
+def chat_text_only():
+    from benchmarks.fake_model import text_response
+    api_server, client = chat_client()
+    original = api_server.client
+    api_server.client = FakeClient([text_response("Hello!")])
+    try:
+        yield lambda: client.post("/chat", json={"message": "hi"})
+    finally:
+        api_server.client = original
+
+
+@benchmark("chat.one_tool_round")
+def chat_one_tool_round():
+    api_server, client = chat_client()
+    original_client = api_server.client
+    original_cwd = os.getcwd()
+    working_dir = tempfile.mkdtemp(prefix="bench_chat_")
+    make_tree(working_dir, entries=200)
+    os.chdir(working_dir)
+    api_server.client = FakeClient()
+    try:
+        yield lambda: client.post("/chat", json={"message": "list the files"})
+    finally:
+        api_server.client = original_client
+        os.chdir(original_cwd)
+        shutil.rmtree(working_dir)
@@ -0,0 +1,27 @@
+import os
+from google.genai import types
+from call_function import call_function
+from functions1.calculate import calculate
+from benchmarks.harness import benchmark
+
+EXPRESSION = "3 * (4 + 5)"
+
+
+@benchmark("dispatch.direct.calculate")
+def direct_calculate():
+    working_dir = os.getcwd()
+    yield lambda: calculate(working_dir, expression=EXPRESSION)
+
+
+@benchmark("dispatch.call_function.calculate")
+def call_function_calculate():
+    working_dir = os.getcwd()
+    function_call = types.FunctionCall(name="calculate", args={"expression": EXPRESSION})
+    yield lambda: call_function(function_call, working_dir)
+
+
+@benchmark("dispatch.call_function.unknown")
+def call_function_unknown():
+    working_dir = os.getcwd()
+    function_call = types.FunctionCall(name="does_not_exist", args={})
+    yield lambda: call_function(function_call, working_dir)
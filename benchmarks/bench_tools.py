@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+from functions1.get_file_info import get_file_info
+from functions1.get_file_content import get_file_content
+from functions1.get_write_file_content import write_file
+from functions1.run_python_file import run_python_file
+from functions1.run_tests import run_tests, mark_changed, forget
+from benchmarks.harness import benchmark
+
+CALCULATOR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "calculator")
+LARGE_DIR_ENTRIES = 5_000
+LARGE_FILE_BYTES = 10 * 1024 * 1024
+WRITE_CONTENT = "x = 1\n" * 20_000
+
+
+def make_tree(root, entries=LARGE_DIR_ENTRIES):
+    """Create a flat directory of small files with a subdirectory every 100 entries."""
+    for i in range(entries):
+        if i % 100 == 0:
+            os.makedirs(os.path.join(root, f"dir_{i}"), exist_ok=True)
+        else:
+            with open(os.path.join(root, f"file_{i}.py"), "w") as f:
+                f.write(f"value = {i}\n")
+
+
+@benchmark("tools.get_files_info.5k_entries")
+def files_info_large_tree():
+    working_dir = tempfile.mkdtemp(prefix="bench_tree_")
+    make_tree(working_dir)
+    try:
+        yield lambda: get_file_info(working_dir, ".")
+    finally:
+        shutil.rmtree(working_dir)
+
+
+@benchmark("tools.get_file_content.10mb_file")
+def file_content_large_file():
+    working_dir = tempfile.mkdtemp(prefix="bench_file_")
+    with open(os.path.join(working_dir, "big.txt"), "w") as f:
+        f.write("a" * LARGE_FILE_BYTES)
+    try:
+        yield lambda: get_file_content(working_dir, "big.txt")
+    finally:
+        shutil.rmtree(working_dir)
+
+
+@benchmark("tools.write_file.120kb")
+def write_file_large():
+    working_dir = tempfile.mkdtemp(prefix="bench_write_")
+    try:
+        yield lambda: write_file(working_dir, "out/generated.py", WRITE_CONTENT)
+    finally:
+        shutil.rmtree(working_dir)
+
+
+@benchmark("tools.run_python_file.hello")
+def run_python_hello():
+    working_dir = tempfile.mkdtemp(prefix="bench_run_")
+    with open(os.path.join(working_dir, "hello.py"), "w") as f:
+        f.write("print('hello')\n")
+    try:
+        yield lambda: run_python_file(working_dir, "hello.py")
+    finally:
+        shutil.rmtree(working_dir)
+
+
+@benchmark("tools.run_python_file.calculator_tests")
+def run_python_calculator_tests():
+    working_dir = tempfile.mkdtemp(prefix="bench_tests_")
+    shutil.copytree(CALCULATOR_DIR, working_dir, dirs_exist_ok=True)
+    try:
+        yield lambda: run_python_file(working_dir, "test.py")
+    finally:
+        shutil.rmtree(working_dir)
+
+
+@benchmark("tools.run_tests.after_edit")
+def run_tests_after_edit():
+    working_dir = tempfile.mkdtemp(prefix="bench_tests_")
+    shutil.copytree(CALCULATOR_DIR, working_dir, dirs_exist_ok=True)
+    run_tests(working_dir)
+
+    def edit_and_test():
+        mark_changed(working_dir, "pkg/calculator.py")
+        return run_tests(working_dir)
+
+    try:
+        yield edit_and_test
+    finally:
+        forget(working_dir)
+        shutil.rmtree(working_dir)
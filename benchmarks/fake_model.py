@@ -0,0 +1,70 @@
+from google.genai import types
+
+
+def text_response(text, prompt_tokens=100, candidates_tokens=20):
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=text)])
+            )
+        ],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=candidates_tokens,
+            total_token_count=prompt_tokens + candidates_tokens,
+        ),
+    )
+
+
+def function_call_response(name, args, prompt_tokens=100, candidates_tokens=10):
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))],
+                )
+            )
+        ],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=candidates_tokens,
+            total_token_count=prompt_tokens + candidates_tokens,
+        ),
+    )
+
+
+class FakeModels:
+    """
+    Offline stand-in for ``client.models``.
+
+    Replays ``script`` (a list of GenerateContentResponse objects) as one
+    conversation: the first call of a conversation returns script[0], each
+    follow-up call that ends in a tool response returns the next entry.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.calls = 0
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        # Count completed tool rounds in this conversation to pick the next reply.
+        rounds = sum(
+            1 for i, content in enumerate(contents)
+            if content.role == "tool" and (i + 1 == len(contents) or contents[i + 1].role != "tool")
+        )
+        index = min(rounds, len(self.script) - 1)
+        return self.script[index]
+
+
+class FakeClient:
+    """Minimal genai.Client replacement exposing only ``models.generate_content``."""
+
+    def __init__(self, script=None):
+        if script is None:
+            script = [
+                function_call_response("get_files_info", {"directory": "."}),
+                text_response("Here are the files in the working directory."),
+            ]
+        self.models = FakeModels(script)
@@ -0,0 +1,136 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+_registry = {}
+
+
+def benchmark(name):
+    """
+    Register a benchmark.
+
+    The decorated function is a generator: everything before its single
+    ``yield`` is setup, the yielded value is the zero-argument callable to
+    time, and everything after the ``yield`` is cleanup. Put cleanup in a
+    ``finally`` so it also runs when the benchmark raises.
+    """
+    def decorator(fn):
+        _registry[name] = contextlib.contextmanager(fn)
+        return fn
+    return decorator
+
+
+def registered(pattern=None):
+    """Return the registered benchmark names, optionally filtered by substring."""
+    return sorted(name for name in _registry if not pattern or pattern in name)
+
+
+def measure(fn, repeat=5):
+    """
+    Time a callable with timeit, auto-ranging the loop count.
+
+    Tool functions print progress lines, so stdout is discarded while timing.
+
+    Returns:
+        dict of per-call seconds (min, median, mean) plus loop/repeat counts
+    """
+    timer = timeit.Timer(fn)
+    with contextlib.redirect_stdout(io.StringIO()):
+        number, _ = timer.autorange()
+        totals = timer.repeat(repeat=repeat, number=number)
+    per_call = [total / number for total in totals]
+    return {
+        "min": min(per_call),
+        "median": statistics.median(per_call),
+        "mean": statistics.fmean(per_call),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(pattern=None, repeat=5, verbose=True):
+    """Run every registered benchmark matching pattern and return a results dict."""
+    results = {}
+    for name in registered(pattern):
+        with _registry[name]() as fn:
+            results[name] = measure(fn, repeat=repeat)
+        if verbose:
+            print(f"{name:<45} {format_seconds(results[name]['median']):>12}  "
+                  f"(x{results[name]['number']})")
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.node(),
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Compare two results dicts on median time per call.
+
+    Returns:
+        list of (name, baseline_median, current_median, change, status) rows,
+        where status is "regression", "improvement", "ok", "new" or "missing"
+    """
+    rows = []
+    base_benchmarks = baseline["benchmarks"]
+    current_benchmarks = current["benchmarks"]
+    for name in sorted(set(base_benchmarks) | set(current_benchmarks)):
+        if name not in base_benchmarks:
+            rows.append((name, None, current_benchmarks[name]["median"], None, "new"))
+            continue
+        if name not in current_benchmarks:
+            rows.append((name, base_benchmarks[name]["median"], None, None, "missing"))
+            continue
+        before = base_benchmarks[name]["median"]
+        after = current_benchmarks[name]["median"]
+        change = (after - before) / before if before else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, change, status))
+    return rows
+
+
+def results_path(name_or_path):
+    """Resolve a bare baseline name to benchmarks/results/<name>.json."""
+    if os.sep in name_or_path or name_or_path.endswith(".json"):
+        return name_or_path
+    return os.path.join(RESULTS_DIR, f"{name_or_path}.json")
+
+
+def save_results(results, name_or_path):
+    path = results_path(name_or_path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_results(name_or_path):
+    with open(results_path(name_or_path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
@@ -0,0 +1,46 @@
+"""
+Estimate the per-call prefix (system prompt + tool declarations) saved by
+tool selection over a replayed prompt set.
+
+    python -m benchmarks.tool_selection_report [benchmarks/prompts/replay.jsonl]
+
+Token counts are estimated offline at ~4 characters per token; the ratio
+between full and selected prefixes is what matters.
+"""
+import os
+import sys
+from google.genai import types
+from main import load_prompts
+from tool_selection import ALL_TOOLS, config_for, select_tools
+
+DEFAULT_PROMPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts", "replay.jsonl")
+CHARS_PER_TOKEN = 4
+
+
+def prefix_tokens(names):
+    config = config_for(names)
+    chars = len(config.system_instruction)
+    for declaration in config.tools[0].function_declarations:
+        chars += len(declaration.model_dump_json(exclude_none=True))
+    return chars // CHARS_PER_TOKEN
+
+
+def main(path=DEFAULT_PROMPTS):
+    prompts = load_prompts(path)
+    full = prefix_tokens(ALL_TOOLS)
+    total_selected = 0
+    for entry in prompts:
+        messages = [types.Content(role="user", parts=[types.Part(text=entry["prompt"])])]
+        names = select_tools(messages)
+        tokens = prefix_tokens(names)
+        total_selected += tokens
+        print(f"{tokens:>5} / {full}  {','.join(names):<75} {entry['prompt'][:50]}")
+    total_full = full * len(prompts)
+    saved = total_full - total_selected
+    print(f"\n{len(prompts)} prompts: ~{total_full} prefix tokens with every tool, "
+          f"~{total_selected} with selection, ~{saved} saved ({saved / total_full:.0%}), "
+          f"{config_for.cache_info().currsize} distinct cached configs")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
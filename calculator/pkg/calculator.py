@@ -48,6 +48,19 @@ class Calculator:
         if not expression or expression.isspace():
             raise ValueError("Expression is empty or contains only whitespace.")
         
+        tokens = self.tokenize(expression)
+        return self._evaluate_infix(tokens)
+
+    def tokenize(self, expression):
+        """
+        Split an expression into number, operator and parenthesis tokens.
+
+        Unary minus is rewritten as (0 - number).
+
+        Raises:
+            ValueError: If no tokens are found or a unary minus is not
+                followed by a number
+        """
         # Clean the expression - remove whitespace
         expression = re.sub(r'\s+', '', expression)
         
@@ -90,8 +103,8 @@ class Calculator:
         
         if not tokens:
             raise ValueError("No valid tokens found in expression.")
-        
-        return self._evaluate_infix(tokens)
+
+        return tokens
 
     def _evaluate_infix(self, tokens):
         """Evaluate infix expression using Shunting Yard algorithm."""
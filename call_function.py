@@ -3,6 +3,19 @@ from functions1.get_file_info import get_file_info
 from functions1.get_file_content import get_file_content
 from functions1.get_write_file_content import write_file
 from functions1.run_python_file import run_python_file
+from functions1.calculate import calculate
+from functions1.run_tests import run_tests, mark_changed
+from functions1.get_file_content import format_file_content
+from prefetch import prefetcher_from_env
+
+# Optional speculative reader for files seen in directory listings (AGENT_PREFETCH=1).
+prefetcher = prefetcher_from_env()
+
+
+def set_prefetcher(new_prefetcher):
+    """Install (or with None, disable) the Prefetcher used by call_function."""
+    global prefetcher
+    prefetcher = new_prefetcher
 
 def call_function(function_call, working_directory, verbose=False):
     """
@@ -24,12 +37,27 @@ def call_function(function_call, working_directory, verbose=False):
     try:
         if function_call.name == "get_files_info":
             result = get_file_info(working_directory, **function_call.args)
+            if prefetcher is not None:
+                prefetcher.after_listing(working_directory, function_call.args.get("directory", "."))
         elif function_call.name == "get_file_content":
-            result = get_file_content(working_directory, **function_call.args)
+            cached = None
+            if prefetcher is not None:
+                cached = prefetcher.get(working_directory, function_call.args["file_path"])
+            if cached is not None:
+                result = format_file_content(function_call.args["file_path"], cached)
+            else:
+                result = get_file_content(working_directory, **function_call.args)
         elif function_call.name == "write_file":
             result = write_file(working_directory, **function_call.args)
+            if prefetcher is not None:
+                prefetcher.invalidate(working_directory, function_call.args["file_path"])
+            mark_changed(working_directory, function_call.args["file_path"])
         elif function_call.name == "run_python_file":
             result = run_python_file(working_directory, **function_call.args)
+        elif function_call.name == "calculate":
+            result = calculate(working_directory, **function_call.args)
+        elif function_call.name == "run_tests":
+            result = run_tests(working_directory, **(function_call.args or {}))
         else:
             return types.Content(
                 role="tool",
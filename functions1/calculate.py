@@ -0,0 +1,64 @@
+from functools import lru_cache
+from google.genai import types
+from calculator.pkg.calculator import Calculator
+from calculator.pkg.render import format_json_output
+
+MAX_CACHED_EXPRESSIONS = 1024
+
+
+@lru_cache(maxsize=1)
+def get_calculator():
+    """Return the shared Calculator instance (its operator tables are built once)."""
+    return Calculator()
+
+
+@lru_cache(maxsize=MAX_CACHED_EXPRESSIONS)
+def evaluate_expression(expression):
+    """
+    Evaluate an expression with the shared Calculator, caching results.
+
+    Raises the same ValueError / ZeroDivisionError as Calculator.evaluate;
+    failed evaluations are not cached.
+    """
+    return get_calculator().evaluate(expression)
+
+
+def evaluate_batch(expressions):
+    """
+    Evaluate a list of expressions in one pass.
+
+    Returns:
+        A list of (result, error) tuples in input order. Exactly one of the
+        two is None for each expression.
+    """
+    results = []
+    for expression in expressions:
+        try:
+            results.append((evaluate_expression(expression), None))
+        except (ValueError, ZeroDivisionError) as e:
+            results.append((None, str(e)))
+    return results
+
+
+def calculate(working_directory, expression):
+    try:
+        result = evaluate_expression(expression)
+    except (ValueError, ZeroDivisionError) as e:
+        return f"Error: {e}"
+    return format_json_output(expression, result)
+
+
+schema_calculate = types.FunctionDeclaration(
+    name="calculate",
+    description="Evaluates an arithmetic expression (+, -, *, /, %, ^ or **, parentheses) and returns the result as JSON.",
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "expression": types.Schema(
+                type=types.Type.STRING,
+                description="The arithmetic expression to evaluate, e.g. \"3 * (4 + 5)\".",
+            ),
+        },
+        required=["expression"],
+    ),
+)
@@ -10,19 +10,24 @@ def get_file_content(working_directory , file_path):
     if not os.path.exists(abs_file_path):
         print(f"File not found: {abs_file_path}")
 
-    file_content_string = ""
     try:
-        with open(abs_file_path,"r") as f:
-            file_content_string = f.read(MAX_CHARS)
-            if len(file_content_string) >= MAX_CHARS:
-                file_content_string += (
-                    f'[...file "{file_path}" truncated data at 500 characters]'
-
-                )
-        return file_content_string
+        return format_file_content(file_path, read_file_head(abs_file_path))
     except Exception as e:
         return f"Error in reading file {e}"
 
+def read_file_head(abs_file_path):
+    """Read at most MAX_CHARS characters from the start of a file."""
+    with open(abs_file_path,"r") as f:
+        return f.read(MAX_CHARS)
+
+def format_file_content(file_path, file_content_string):
+    if len(file_content_string) >= MAX_CHARS:
+        file_content_string += (
+            f'[...file "{file_path}" truncated data at 500 characters]'
+
+        )
+    return file_content_string
+
 schema_get_file_content = types.FunctionDeclaration(
     name="get_file_content",
     description="Reads and returns the content of a file, truncated to a maximum number of characters.",
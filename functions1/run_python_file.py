@@ -1,14 +1,228 @@
 import os
+import sys
+import time
+import signal
+import threading
 import subprocess
+from collections import deque
 from google.genai import types
 
+try:
+    import resource
+except ImportError:  # Windows: no rlimits or per-child rusage
+    resource = None
+
+TIMEOUT_SECONDS = 30
+# How long to wait for output after the script exits, before and after
+# killing its process group.
+PIPE_DRAIN_SECONDS = 1
+
+# Per-run limits, overridable from the environment. 0 disables a limit.
+DEFAULT_LIMITS = {
+    "cpu_seconds": int(os.environ.get("RUN_LIMIT_CPU_SECONDS", 20)),
+    "address_space_bytes": int(os.environ.get("RUN_LIMIT_ADDRESS_SPACE_BYTES", 1024 * 1024 * 1024)),
+    "open_files": int(os.environ.get("RUN_LIMIT_OPEN_FILES", 256)),
+    "output_bytes": int(os.environ.get("RUN_LIMIT_OUTPUT_BYTES", 256 * 1024)),
+}
+
+
+class RunMetrics:
+    """Thread-safe aggregate of resource usage across run_python_file calls."""
+
+    def __init__(self, recent=100):
+        self._lock = threading.Lock()
+        self._per_file = {}
+        self._recent = deque(maxlen=recent)
+        self.runs = 0
+
+    def record(self, file_path, usage):
+        with self._lock:
+            self.runs += 1
+            self._recent.append({"file_path": file_path, **usage})
+            totals = self._per_file.setdefault(file_path, {
+                "runs": 0, "user_cpu_s": 0.0, "sys_cpu_s": 0.0, "wall_s": 0.0,
+                "max_rss_bytes": 0, "limit_kills": 0, "timeouts": 0,
+            })
+            totals["runs"] += 1
+            totals["user_cpu_s"] += usage["user_cpu_s"]
+            totals["sys_cpu_s"] += usage["sys_cpu_s"]
+            totals["wall_s"] += usage["wall_s"]
+            totals["max_rss_bytes"] = max(totals["max_rss_bytes"], usage["max_rss_bytes"])
+            totals["limit_kills"] += 1 if usage["limit_hit"] else 0
+            totals["timeouts"] += 1 if usage["timed_out"] else 0
+
+    def snapshot(self):
+        with self._lock:
+            per_file = {path: dict(totals) for path, totals in self._per_file.items()}
+            return {
+                "runs": self.runs,
+                "user_cpu_s": sum(t["user_cpu_s"] for t in per_file.values()),
+                "sys_cpu_s": sum(t["sys_cpu_s"] for t in per_file.values()),
+                "wall_s": sum(t["wall_s"] for t in per_file.values()),
+                "per_file": per_file,
+                "recent": list(self._recent),
+            }
+
+
+run_metrics = RunMetrics()
+
+
+def _apply_limits(limits):
+    """Return a preexec_fn that sets rlimits in the child before exec."""
+    def preexec():
+        if limits["cpu_seconds"]:
+            resource.setrlimit(resource.RLIMIT_CPU, (limits["cpu_seconds"], limits["cpu_seconds"] + 1))
+        if limits["address_space_bytes"]:
+            resource.setrlimit(resource.RLIMIT_AS, (limits["address_space_bytes"], limits["address_space_bytes"]))
+        if limits["open_files"]:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (limits["open_files"], limits["open_files"]))
+    return preexec
+
+
+class _BoundedReader(threading.Thread):
+    """Drain one output pipe, keeping at most limit bytes and calling on_limit once past it."""
+
+    def __init__(self, pipe, limit, on_limit):
+        super().__init__(daemon=True)
+        self.pipe = pipe
+        self.limit = limit
+        self.on_limit = on_limit
+        self.chunks = []
+        self.kept = 0
+        self.total = 0
+
+    def run(self):
+        while True:
+            chunk = self.pipe.read1(65536)
+            if not chunk:
+                return
+            self.total += len(chunk)
+            if self.limit and self.kept < self.limit:
+                chunk = chunk[:self.limit - self.kept]
+            elif self.limit:
+                chunk = b""
+            self.chunks.append(chunk)
+            self.kept += len(chunk)
+            if self.limit and self.total > self.limit:
+                self.on_limit()
+
+    def text(self):
+        text = b"".join(list(self.chunks)).decode("utf-8", errors="replace")
+        if self.limit and self.total > self.limit:
+            text += f"\n[...output truncated at {self.limit} bytes]"
+        return text
+
+
+def _join_readers(readers, seconds):
+    deadline = time.monotonic() + seconds
+    for reader in readers:
+        reader.join(max(0.0, deadline - time.monotonic()))
+
+
+def _execute(final_args, working_directory, limits):
+    """
+    Run a command with rlimits, returning (returncode, stdout, stderr, usage).
+
+    stdout and stderr are read through pipes and at most output_bytes of each
+    is kept; a process writing more than that is killed, like one exceeding
+    its CPU limit, instead of filling memory or disk.
+    """
+    state_lock = threading.Lock()
+    state = {"reaped": False, "killed_for": None}
+    kwargs = {}
+    if resource is not None:
+        kwargs = {"preexec_fn": _apply_limits(limits), "start_new_session": True}
+    start = time.perf_counter()
+    process = subprocess.Popen(final_args, cwd=working_directory, stdin=subprocess.DEVNULL,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+
+    def kill(reason):
+        # Once the child is reaped its pid may be reused, so never signal it
+        # after that; the first reason to kill a live process wins.
+        with state_lock:
+            if state["reaped"]:
+                return
+            if state["killed_for"] is None:
+                state["killed_for"] = reason
+            try:
+                if resource is not None:
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    readers = [_BoundedReader(pipe, limits["output_bytes"], lambda: kill("output"))
+               for pipe in (process.stdout, process.stderr)]
+    for reader in readers:
+        reader.start()
+    timer = threading.Timer(TIMEOUT_SECONDS, kill, args=("timeout",))
+    timer.start()
+    try:
+        if resource is None:
+            returncode = process.wait()
+            rusage = None
+        else:
+            # Wait for exit without reaping, so kill() cannot race with pid reuse.
+            if hasattr(os, "waitid"):
+                os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+            with state_lock:
+                state["reaped"] = True
+            # wait4 returns this child's own rusage, unlike RUSAGE_CHILDREN
+            # which would mix in runs from other request threads.
+            _, status, rusage = os.wait4(process.pid, 0)
+            returncode = os.waitstatus_to_exitcode(status)
+            process.returncode = returncode
+    finally:
+        timer.cancel()
+    _join_readers(readers, PIPE_DRAIN_SECONDS)
+    if any(reader.is_alive() for reader in readers) and resource is not None:
+        # A background process the script started still holds the pipes.
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        _join_readers(readers, PIPE_DRAIN_SECONDS)
+    # One that left the process group (e.g. its own session) cannot be killed
+    # from here: its readers are left behind as daemon threads and the output
+    # read so far is returned.
+    pipes_held = any(reader.is_alive() for reader in readers)
+    wall = time.perf_counter() - start
+    if not pipes_held:
+        process.stdout.close()
+        process.stderr.close()
+
+    max_rss = 0
+    if rusage is not None:
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+    # The CPU soft limit sends SIGXCPU and the hard limit one second later SIGKILL;
+    # kills for our own timeout or output limit are known from state.
+    killed_by = -returncode if returncode is not None and returncode < 0 else None
+    timed_out = state["killed_for"] == "timeout"
+    output_limit_hit = state["killed_for"] == "output"
+    cpu_limit_hit = (resource is not None and state["killed_for"] is None
+                     and killed_by in (signal.SIGXCPU, signal.SIGKILL))
+    usage = {
+        "user_cpu_s": round(rusage.ru_utime, 4) if rusage else 0.0,
+        "sys_cpu_s": round(rusage.ru_stime, 4) if rusage else 0.0,
+        "max_rss_bytes": max_rss,
+        "wall_s": round(wall, 4),
+        "timed_out": timed_out,
+        "limit_hit": cpu_limit_hit or output_limit_hit,
+        "output_limit_hit": output_limit_hit,
+        "pipes_held": pipes_held,
+    }
+    return returncode, readers[0].text(), readers[1].text(), usage
+
+
 def run_python_file(working_directory:str , file_path:str,args=[]):
     abs_working_dirct_path = os.path.abspath(working_directory)
     abs_file_path = os.path.abspath(os.path.join(working_directory, file_path))
-    
+
     if not abs_file_path.startswith(abs_working_dirct_path):
         return f"Error: {file_path} is not inside {working_directory}"
-    
+
     if not os.path.exists(abs_file_path):
         parent_dir = os.path.dirname(abs_file_path)
         try:
@@ -17,24 +231,40 @@ def run_python_file(working_directory:str , file_path:str,args=[]):
             return f"Could not create directory {parent_dir}: {e}"
     if not file_path.endswith(".py"):
         return f"file with path{file_path} is not a python file."
+    # Limits come only from the operator's configuration, never from tool arguments.
+    limits = dict(DEFAULT_LIMITS)
     final_args = ["python3", file_path]
     final_args.extend(args)
-    output =  subprocess.run(final_args,cwd=working_directory,timeout=30,capture_output=True)
+    returncode, stdout, stderr, usage = _execute(final_args, working_directory, limits)
+    run_metrics.record(file_path, usage)
+    if usage["pipes_held"]:
+        stdout += "\n[...output cut off: a background process started by the script still holds the output pipes]"
+
+    resources_line = (
+        f"RESOURCES: user_cpu={usage['user_cpu_s']:.3f}s sys_cpu={usage['sys_cpu_s']:.3f}s "
+        f"max_rss={usage['max_rss_bytes'] / (1024 * 1024):.1f}MB wall={usage['wall_s']:.3f}s"
+    )
     final_return_string =  f"""
-STDOUT:{output.stdout}
-STDERR:{output.stderr}
-
-"""    
-   
-    if output.stdout == "" and output.stderr == "":
-           return f"process returned with no response error:{output.stderr} , output:{output.stdout}"
-    if output.returncode != 0:
-           final_return_string += f"process existed with error code{output.returncode}"
+STDOUT:{stdout}
+STDERR:{stderr}
+{resources_line}
+"""
+
+    if usage["timed_out"]:
+           final_return_string += f"process killed after {TIMEOUT_SECONDS}s timeout"
+    elif usage["output_limit_hit"]:
+           final_return_string += f"process killed after exceeding a resource limit (output={limits['output_bytes']} bytes)"
+    elif usage["limit_hit"]:
+           final_return_string += f"process killed after exceeding a resource limit (cpu={limits['cpu_seconds']}s)"
+    elif stdout == "" and stderr == "" and returncode == 0:
+           return f"process returned with no response error:{stderr} , output:{stdout}\n{resources_line}"
+    elif returncode != 0:
+           final_return_string += f"process existed with error code{returncode}"
     return final_return_string
 
 schema_run_python_file = types.FunctionDeclaration(
     name="run_python_file",
-    description="Executes a Python script with the given arguments and returns its output and errors.",
+    description="Executes a Python script with the given arguments and returns its output, errors and resource usage.",
     parameters=types.Schema(
         type=types.Type.OBJECT,
         properties={
@@ -52,4 +282,4 @@ schema_run_python_file = types.FunctionDeclaration(
         required=["file_path"],
     ),
 )
-    
+
@@ -0,0 +1,400 @@
+import os
+import ast
+import sys
+import json
+import time
+import select
+import signal
+import threading
+import subprocess
+from collections import OrderedDict
+from google.genai import types
+from functions1.run_python_file import DEFAULT_LIMITS, TIMEOUT_SECONDS, _apply_limits, resource
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "warm_test_worker.py")
+SKIP_DIRS = {".git", ".venv", "venv", "__pycache__", "node_modules", ".tox", ".nox", ".mypy_cache", ".pytest_cache"}
+MAX_INDEXED_FILES = 5000
+MAX_REPORTED_PROBLEMS = 10
+# Working directories tracked at once; the least recently used are forgotten.
+MAX_INDEXES = 32
+MAX_WORKERS = 8
+
+
+def is_test_file(rel_path):
+    name = os.path.basename(rel_path)
+    return name.endswith(".py") and (
+        name.startswith("test_") or name.endswith("_test.py") or name in ("test.py", "tests.py")
+    )
+
+
+def _directory_id(path):
+    """(device, inode) of a directory, so a replaced directory at the same path is noticed."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+def _module_candidates(base_dir, module):
+    path = os.path.join(base_dir, *module.split("."))
+    return (path + ".py", os.path.join(path, "__init__.py"))
+
+
+class TestIndex:
+    """
+    Test files of one working directory and the local modules each imports.
+
+    Imports are resolved the way ``python <test file>`` would see them: against
+    the importing file's directory and the working directory. Per-file imports
+    are cached by mtime, so refreshing after an edit only re-parses that file.
+    Callers hold ``lock`` while reading or updating the index.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.directory_id = _directory_id(self.root)
+        self.lock = threading.Lock()
+        self.imports = {}   # rel_path -> set of local rel_paths it imports
+        self._mtimes = {}
+        self.tests = set()
+        self.changed = set()
+        self.failed = set()
+        self.has_run = False
+        self.rescan()
+
+    def rescan(self):
+        """Pick up added, edited and deleted files; unchanged files are only stat'ed."""
+        seen = set(self._walk())
+        for rel_path in seen | set(self.imports):
+            self.refresh(rel_path)
+
+    def _walk(self):
+        count = 0
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    yield os.path.relpath(os.path.join(dirpath, filename), self.root)
+                    count += 1
+                    if count >= MAX_INDEXED_FILES:
+                        return
+
+    def _resolve(self, rel_path, node):
+        file_dir = os.path.dirname(os.path.join(self.root, rel_path))
+        modules = []
+        if isinstance(node, ast.Import):
+            modules = [(alias.name, (file_dir, self.root)) for alias in node.names]
+        elif node.level:
+            base = file_dir
+            for _ in range(node.level - 1):
+                base = os.path.dirname(base)
+            prefix = node.module or ""
+            modules = [(prefix, (base,))] if prefix else []
+            modules += [(f"{prefix}.{alias.name}".strip("."), (base,)) for alias in node.names]
+        elif node.module:
+            modules = [(node.module, (file_dir, self.root))]
+            modules += [(f"{node.module}.{alias.name}", (file_dir, self.root)) for alias in node.names]
+
+        found = set()
+        for module, bases in modules:
+            for base in bases:
+                for candidate in _module_candidates(base, module):
+                    if os.path.isfile(candidate):
+                        found.add(os.path.relpath(candidate, self.root))
+        return found
+
+    def refresh(self, rel_path):
+        """Re-read one file's imports (or forget it if it no longer exists)."""
+        abs_path = os.path.join(self.root, rel_path)
+        try:
+            mtime = os.stat(abs_path).st_mtime_ns
+        except OSError:
+            self.imports.pop(rel_path, None)
+            self._mtimes.pop(rel_path, None)
+            self.tests.discard(rel_path)
+            return
+        if self._mtimes.get(rel_path) == mtime:
+            return
+        self._mtimes[rel_path] = mtime
+        try:
+            with open(abs_path, "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=rel_path)
+        except (SyntaxError, UnicodeDecodeError, ValueError):
+            tree = None
+        deps = set()
+        if tree is not None:
+            for node in ast.walk(tree):
+                if isinstance(node, (ast.Import, ast.ImportFrom)):
+                    deps |= self._resolve(rel_path, node)
+        deps.discard(rel_path)
+        self.imports[rel_path] = deps
+        if is_test_file(rel_path):
+            self.tests.add(rel_path)
+
+    def mark_changed(self, rel_path):
+        if rel_path.endswith(".py"):
+            self.refresh(rel_path)
+        self.changed.add(rel_path)
+
+    def affected_tests(self, changed):
+        """Test files that are, or transitively import, any of the changed files."""
+        dependents = {}
+        for path, deps in self.imports.items():
+            for dep in deps:
+                dependents.setdefault(dep, set()).add(path)
+        seen = set(changed)
+        stack = list(changed)
+        while stack:
+            for dependent in dependents.get(stack.pop(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return sorted(seen & self.tests)
+
+
+class TestWorker:
+    """A long-lived warm_test_worker.py process for one working directory."""
+
+    def __init__(self, working_directory):
+        self.working_directory = working_directory
+        self.directory_id = _directory_id(working_directory)
+        self.lock = threading.Lock()
+        self.process = None
+        self.retired = False
+
+    def _start(self):
+        kwargs = {}
+        if resource is not None:
+            # The worker itself lives across many runs, so its CPU limit is
+            # applied to each forked test child instead.
+            kwargs["preexec_fn"] = _apply_limits({**DEFAULT_LIMITS, "cpu_seconds": 0})
+        self.process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT, str(DEFAULT_LIMITS["cpu_seconds"])], cwd=self.working_directory,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, start_new_session=True, **kwargs,
+        )
+
+    def stop(self):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, AttributeError):
+                process.kill()
+            process.wait()
+        for pipe in (process.stdin, process.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+    def retire(self):
+        """Stop the worker for good; later runs report an error instead of restarting it."""
+        self.retired = True
+        self.stop()
+
+    def run(self, test_file, timeout=TIMEOUT_SECONDS):
+        if self.retired:
+            return {"test_file": test_file, "passed": 0, "skipped": 0, "duration_s": 0.0,
+                    "problems": [{"id": test_file, "kind": "ERROR", "message": "test worker was stopped"}]}
+        if self.process is None or self.process.poll() is not None:
+            self._start()
+        process = self.process
+        try:
+            process.stdin.write(json.dumps({"test_file": test_file}) + "\n")
+            process.stdin.flush()
+            ready, _, _ = select.select([process.stdout], [], [], timeout)
+            line = process.stdout.readline() if ready else ""
+        except (OSError, ValueError):
+            # Stopped from another thread (see forget) while this run was in progress.
+            ready, line = True, ""
+        if not line:
+            # Timed out or crashed: the worker (and any forked test) is killed and restarted next run.
+            self.stop()
+            message = f"timed out after {timeout}s" if not ready else "test worker exited unexpectedly"
+            return {"test_file": test_file, "passed": 0, "skipped": 0, "duration_s": timeout if not ready else 0.0,
+                    "problems": [{"id": test_file, "kind": "ERROR", "message": message}]}
+        return json.loads(line)
+
+
+_indexes = OrderedDict()  # root -> TestIndex, least recently used first
+_workers = OrderedDict()  # root -> TestWorker, least recently used first
+_state_lock = threading.Lock()
+
+
+def _forget_locked(root):
+    _indexes.pop(root, None)
+    worker = _workers.pop(root, None)
+    if worker is not None:
+        worker.retire()
+
+
+def _evict(table, keep, limit):
+    """Drop least recently used entries beyond limit, skipping workers that are running tests."""
+    for root in list(table):
+        if len(table) <= limit:
+            return
+        if root == keep:
+            continue
+        entry = table[root]
+        if isinstance(entry, TestWorker):
+            if not entry.lock.acquire(blocking=False):
+                continue  # busy: the table stays over its limit until the worker is idle
+            try:
+                entry.retire()
+            finally:
+                entry.lock.release()
+        del table[root]
+
+
+def forget(working_directory):
+    """Stop the working directory's test worker and drop its index (e.g. when a workspace is released)."""
+    with _state_lock:
+        _forget_locked(os.path.abspath(working_directory))
+
+
+def _lookup(table, working_directory, factory, limit):
+    root = os.path.abspath(working_directory)
+    directory_id = _directory_id(root)
+    with _state_lock:
+        entry = table.get(root)
+        if entry is not None and entry.directory_id != directory_id:
+            # Same path, different directory: a workspace was released and leased again.
+            _forget_locked(root)
+            entry = None
+        if entry is None:
+            entry = table[root] = factory(root)
+        table.move_to_end(root)
+        _evict(table, root, limit)
+        return entry
+
+
+def _index_for(working_directory):
+    return _lookup(_indexes, working_directory, TestIndex, MAX_INDEXES)
+
+
+def _worker_for(working_directory):
+    return _lookup(_workers, working_directory, TestWorker, MAX_WORKERS)
+
+
+def _acquire_worker(working_directory):
+    """Return the directory's worker with its lock held, replacing one retired in the meantime."""
+    while True:
+        worker = _worker_for(working_directory)
+        worker.lock.acquire()
+        if not worker.retired:
+            return worker
+        worker.lock.release()
+
+
+def mark_changed(working_directory, file_path):
+    """Record an edit so the next run_tests reruns only what it affects."""
+    root = os.path.abspath(working_directory)
+    abs_file_path = os.path.abspath(os.path.join(working_directory, file_path))
+    if not abs_file_path.startswith(root):
+        return
+    with _state_lock:
+        index = _indexes.get(root)
+    # Without an index there is nothing to narrow yet: the first run covers every test.
+    if index is not None:
+        with index.lock:
+            index.mark_changed(os.path.relpath(abs_file_path, root))
+
+
+def format_summary(results, reason):
+    passed = sum(result["passed"] for result in results)
+    skipped = sum(result["skipped"] for result in results)
+    problems = [problem for result in results for problem in result["problems"]]
+    failed = sum(1 for problem in problems if problem["kind"] == "FAIL")
+    errors = len(problems) - failed
+    duration = sum(result["duration_s"] for result in results)
+    status = "OK" if not problems else "FAILED"
+    lines = [
+        f"{status}: {len(results)} test file(s), {passed} passed, {failed} failed, {errors} errors"
+        + (f", {skipped} skipped" if skipped else "") + f" in {duration:.2f}s ({reason})"
+    ]
+    for problem in problems[:MAX_REPORTED_PROBLEMS]:
+        lines.append(f"{problem['kind']} {problem['id']}: {problem['message']}")
+    if len(problems) > MAX_REPORTED_PROBLEMS:
+        lines.append(f"... and {len(problems) - MAX_REPORTED_PROBLEMS} more")
+    return "\n".join(lines)
+
+
+def run_tests(working_directory, test_paths=None, run_all=False):
+    abs_working_dirct_path = os.path.abspath(working_directory)
+    index = _index_for(working_directory)
+
+    with index.lock:
+        # Edits recorded while the tests run stay pending for the next call.
+        changed = set(index.changed)
+        if test_paths:
+            selected = []
+            for test_path in test_paths:
+                abs_test_path = os.path.abspath(os.path.join(working_directory, test_path))
+                if not abs_test_path.startswith(abs_working_dirct_path):
+                    return f"Error: {test_path} is not inside {working_directory}"
+                if not os.path.isfile(abs_test_path):
+                    return f"Error: test file {test_path} not found"
+                selected.append(os.path.relpath(abs_test_path, abs_working_dirct_path))
+            reason = "requested"
+        elif run_all or not index.has_run:
+            index.rescan()
+            selected = sorted(index.tests)
+            reason = "all tests"
+        else:
+            affected = set(index.affected_tests(changed))
+            previously_failed = index.failed & index.tests
+            selected = sorted(affected | previously_failed)
+            if not selected:
+                index.changed -= changed
+                return f"No tests affected by changes since the last run ({len(index.tests)} test file(s) known)."
+            reasons = []
+            if affected:
+                reasons.append("affected by " + ", ".join(sorted(changed)))
+            if previously_failed - affected:
+                reasons.append("rerunning previous failures")
+            reason = "; ".join(reasons)
+
+    if not selected:
+        return "No test files found (looked for test_*.py, *_test.py, test.py, tests.py)."
+
+    start = time.perf_counter()
+    worker = _acquire_worker(working_directory)
+    try:
+        results = [worker.run(test_file) for test_file in selected]
+    finally:
+        worker.lock.release()
+    with index.lock:
+        for result in results:
+            if result["problems"]:
+                index.failed.add(result["test_file"])
+            else:
+                index.failed.discard(result["test_file"])
+        if not test_paths:
+            index.changed -= changed
+            index.has_run = True
+    summary = format_summary(results, reason)
+    return summary + f"\nwall={time.perf_counter() - start:.2f}s"
+
+
+schema_run_tests = types.FunctionDeclaration(
+    name="run_tests",
+    description="Runs the project's unittest/pytest tests in a warm worker and returns a compact pass/fail summary. By default only tests affected by files written since the last run (and previously failing tests) are rerun.",
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "test_paths": types.Schema(
+                type=types.Type.ARRAY,
+                items=types.Schema(type=types.Type.STRING),
+                description="Specific test files to run, relative to the working directory.",
+            ),
+            "run_all": types.Schema(
+                type=types.Type.BOOLEAN,
+                description="Run every discovered test file instead of only the affected ones.",
+            ),
+        },
+    ),
+)
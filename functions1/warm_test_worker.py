@@ -0,0 +1,167 @@
+"""
+Warm test worker used by run_tests.
+
+Reads one JSON request per line on stdin ({"test_file": "<path relative to cwd>"})
+and answers with one JSON result per line on stdout. The worker itself only
+imports the standard library (and pytest, if installed); every test file runs
+in a forked child so project modules are imported fresh after each edit while
+interpreter start-up is paid once.
+
+Usage: warm_test_worker.py [cpu_seconds]  (CPU limit per test file, 0 for none)
+"""
+import os
+import sys
+import json
+import time
+import signal
+import resource
+import traceback
+import unittest
+import importlib.util
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+MAX_MESSAGE_CHARS = 300
+
+
+def short_message(exc_text):
+    """Last line of a formatted traceback, e.g. 'AssertionError: 3 != 4'."""
+    lines = [line for line in exc_text.strip().splitlines() if line.strip()]
+    message = lines[-1].strip() if lines else ""
+    return message[:MAX_MESSAGE_CHARS]
+
+
+class _CompactResult(unittest.TestResult):
+    def __init__(self, test_file):
+        super().__init__()
+        self.test_file = test_file
+        self.passed = 0
+        self.problems = []
+
+    def _id(self, test):
+        return f"{self.test_file}::{test.id().split('.', 1)[-1]}"
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self.passed += 1
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self.problems.append({"id": self._id(test), "kind": "FAIL",
+                              "message": short_message(self.failures[-1][1])})
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self.problems.append({"id": self._id(test), "kind": "ERROR",
+                              "message": short_message(self.errors[-1][1])})
+
+
+def run_unittest(test_file, module):
+    suite = unittest.defaultTestLoader.loadTestsFromModule(module)
+    result = _CompactResult(test_file)
+    suite.run(result)
+    return {"passed": result.passed, "skipped": len(result.skipped), "problems": result.problems}
+
+
+def run_pytest(test_file):
+    class Collector:
+        def __init__(self):
+            self.passed = 0
+            self.skipped = 0
+            self.problems = []
+
+        def pytest_runtest_logreport(self, report):
+            if report.when == "call" and report.passed:
+                self.passed += 1
+            elif report.skipped:
+                self.skipped += 1
+            elif report.failed:
+                kind = "FAIL" if report.when == "call" else "ERROR"
+                self.problems.append({"id": report.nodeid, "kind": kind,
+                                      "message": short_message(str(report.longrepr))})
+
+        def pytest_collectreport(self, report):
+            if report.failed:
+                self.problems.append({"id": report.nodeid or test_file, "kind": "ERROR",
+                                      "message": short_message(str(report.longrepr))})
+
+    collector = Collector()
+    pytest.main([test_file, "-q", "-p", "no:cacheprovider"], plugins=[collector])
+    return {"passed": collector.passed, "skipped": collector.skipped, "problems": collector.problems}
+
+
+def run_test_file(test_file):
+    """Import and run one test file; called in a forked child."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(test_file)))
+    spec = importlib.util.spec_from_file_location("__run_tests_module__", test_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    has_test_cases = any(
+        isinstance(obj, type) and issubclass(obj, unittest.TestCase) for obj in vars(module).values()
+    )
+    if not has_test_cases:
+        if pytest is not None:
+            return run_pytest(test_file)
+        # Plain test functions need pytest; reporting them as passed would hide failures.
+        return {"passed": 0, "skipped": 0, "problems": [
+            {"id": test_file, "kind": "ERROR", "message": "no unittest TestCase found and pytest is not installed"}
+        ]}
+    return run_unittest(test_file, module)
+
+
+def handle(test_file, cpu_seconds=0):
+    start = time.perf_counter()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        if cpu_seconds:
+            # CPU time counts from the fork, so each test file gets the full budget.
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        # stdin/stdout carry the worker protocol: tests must not read from or
+        # print into them, and their own output is not part of the summary.
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(devnull, fd)
+        try:
+            result = run_test_file(test_file)
+        except BaseException:
+            result = {"passed": 0, "skipped": 0, "problems": [
+                {"id": test_file, "kind": "ERROR", "message": short_message(traceback.format_exc())}
+            ]}
+        with os.fdopen(write_fd, "w") as pipe:
+            pipe.write(json.dumps(result))
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        data = pipe.read()
+    _, status = os.waitpid(pid, 0)
+    exit_code = os.waitstatus_to_exitcode(status)
+    if data:
+        result = json.loads(data)
+    else:
+        if cpu_seconds and -exit_code in (signal.SIGXCPU, signal.SIGKILL):
+            message = f"test process killed after exceeding the CPU limit ({cpu_seconds}s)"
+        else:
+            message = f"test process died with exit status {exit_code}"
+        result = {"passed": 0, "skipped": 0, "problems": [{"id": test_file, "kind": "ERROR", "message": message}]}
+    result["test_file"] = test_file
+    result["duration_s"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def main():
+    cpu_seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    for line in sys.stdin:
+        request = json.loads(line)
+        sys.stdout.write(json.dumps(handle(request["test_file"], cpu_seconds)) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,195 @@
 import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import statistics
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from google import genai
-import sys
 from google.genai import types
-from functions1.get_file_info import schema_get_files_info
-from functions1.get_file_content import schema_get_file_content
-from functions1.get_write_file_content import schema_write_file
-from functions1.run_python_file import schema_run_python_file
 from call_function import call_function
-def main():
-    load_dotenv()
-    api_key = os.environ.get("GEMINI_API_KEY")
-    client = genai.Client(api_key=api_key)
-    system_prompt = """
-        You are a helpful AI coding agent.
+from tool_selection import select_config
+from replay_cache import cache_from_env, wrap_client, working_directory as replay_working_directory
 
-        When a user asks a question or makes a request, make a function call plan. You can perform the following operations:
+MODEL = "gemini-2.0-flash-001"
+MAX_ITERATIONS = 20
 
-        - List files and directories
-        - read content of the file
-        - write to a file
-        - run a python file with optional arguements
-        
 
-        All paths you provide should be relative to the working directory. You do not need to specify the working directory in your function calls as it is automatically injected for security reasons.
-        """
+def run_agent(client, messages, working_dir, verbose=False, max_iterations=MAX_ITERATIONS):
+    """
+    Run the function-calling loop until the model answers with text.
 
-    if len(sys.argv) < 2:
-        print("I need a prompt")
-        sys.exit()
+    The model turns and tool responses are appended to ``messages`` in place,
+    so the caller can keep the list as conversation history.
 
-    verbose_flag = False
-    if len(sys.argv) == 3 and sys.argv[2] == "--verbose":
-        verbose_flag = True
+    Returns:
+        dict with the final text, the names of the functions called and the
+        token counts summed over every generate_content call
+    """
+    usage = {"prompt_token_count": 0, "candidates_token_count": 0, "total_token_count": 0}
+    function_calls = []
+    for _ in range(max_iterations):
+        with replay_working_directory(working_dir):
+            response = client.models.generate_content(model=MODEL, contents=messages, config=select_config(messages))
+        if response is None:
+            raise RuntimeError("Response is malformed")
+        if response.usage_metadata:
+            for key in usage:
+                usage[key] += getattr(response.usage_metadata, key) or 0
+        if verbose and response.usage_metadata:
+            print(f"prompt tokens: {response.usage_metadata.prompt_token_count}")
+            print(f"response tokens: {response.usage_metadata.candidates_token_count}")
+
+        if response.candidates and response.candidates[0].content:
+            messages.append(response.candidates[0].content)
+
+        if not response.function_calls:
+            return {"response": response.text or "", "function_calls": function_calls, "usage": usage}
 
-    prompt = sys.argv[1]
-    messages = [
-    types.Content(
-        role="user",
-        parts=[types.Part(text=prompt)]
-    )
-] 
-    available_functions = types.Tool(
-    function_declarations=[
-        schema_get_files_info,
-        schema_get_file_content,
-        schema_write_file,
-        schema_run_python_file
-    ]
-)
-    config=types.GenerateContentConfig(
-    tools=[available_functions], system_instruction=system_prompt
-)
-    
-
-    response = client.models.generate_content(
-        model="gemini-2.0-flash-001", contents=messages,config=config
-    )
-    if response is None or response.usage_metadata is None:
-        print("Response is malformed")
-        return
-    if verbose_flag:
-        print(f"user_prompt: {prompt}")
-        print(f"prompt tokens: {response.usage_metadata.prompt_token_count}")
-        print(f"response tokens: {response.usage_metadata.candidates_token_count}")
-    if response.function_calls:
         for function_call in response.function_calls:
-            # Get the current working directory
-            working_dir = os.getcwd()
-            # Call the function with the function call object and working directory
-            tool_response = call_function(function_call, working_dir, verbose=verbose_flag)
-            # You might want to append the tool response to the messages for the next API call
-            # messages.append(tool_response)
-    else:
-        print(response.text)
+            tool_response = call_function(function_call, working_dir, verbose=verbose)
+            if verbose:
+                print(f"-> {tool_response.parts[0].function_response.response}")
+            function_calls.append(function_call.name)
+            messages.append(tool_response)
+
+    return {
+        "response": f"Stopped after {max_iterations} iterations without a final response.",
+        "function_calls": function_calls,
+        "usage": usage,
+    }
+
+
+def run_once(client, prompt, verbose=False):
+    if verbose:
+        print(f"user_prompt: {prompt}")
+    messages = [types.Content(role="user", parts=[types.Part(text=prompt)])]
+    result = run_agent(client, messages, os.getcwd(), verbose=verbose)
+    print(result["response"])
+
+
+def run_repl(client, verbose=False):
+    """Interactive session: one warm process, conversation kept across prompts."""
+    print("AI coding agent. Type /reset to clear the conversation, /exit to quit.")
+    messages = []
+    working_dir = os.getcwd()
+    while True:
+        try:
+            prompt = input("> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return
+        if not prompt:
+            continue
+        if prompt in ("/exit", "/quit"):
+            return
+        if prompt == "/reset":
+            messages = []
+            print("Conversation cleared.")
+            continue
 
-    
-    
+        history_length = len(messages)
+        messages.append(types.Content(role="user", parts=[types.Part(text=prompt)]))
+        start = time.perf_counter()
+        try:
+            result = run_agent(client, messages, working_dir, verbose=verbose)
+        except Exception as e:
+            # Drop the partial turn so the next prompt starts from a valid history.
+            del messages[history_length:]
+            print(f"Error: {e}")
+            continue
+        print(result["response"])
+        if verbose:
+            print(f"[{time.perf_counter() - start:.2f}s, {result['usage']['total_token_count']} tokens]")
 
-    
 
-    # Make sure to print the file info for the calculator directory at the project root
+def load_prompts(path):
+    """Read a JSONL prompts file: one {"prompt": ..., "id": optional} object per line."""
+    prompts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            prompts.append({"id": entry.get("id", line_number), "prompt": entry["prompt"]})
+    return prompts
+
+
+def run_batch_prompt(client, entry, working_dir):
+    messages = [types.Content(role="user", parts=[types.Part(text=entry["prompt"])])]
+    start = time.perf_counter()
+    record = {"id": entry["id"], "prompt": entry["prompt"]}
+    try:
+        result = run_agent(client, messages, working_dir)
+        record.update(result)
+        record["error"] = None
+    except Exception as e:
+        record.update({"response": None, "function_calls": [], "usage": None, "error": str(e)})
+    record["latency_s"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def run_batch(client, prompts_path, concurrency, output_path):
+    """Run independent prompts concurrently and write one JSON result per line."""
+    prompts = load_prompts(prompts_path)
+    working_dir = os.getcwd()
+    results_stdout = sys.stdout
+    start = time.perf_counter()
+    # Tool progress lines go to stderr so stdout carries only JSONL results.
+    with contextlib.redirect_stdout(sys.stderr), ThreadPoolExecutor(max_workers=concurrency) as executor:
+        records = list(executor.map(lambda entry: run_batch_prompt(client, entry, working_dir), prompts))
+    elapsed = time.perf_counter() - start
+
+    output = open(output_path, "w", encoding="utf-8") if output_path else results_stdout
+    try:
+        for record in records:
+            output.write(json.dumps(record) + "\n")
+    finally:
+        if output_path:
+            output.close()
+
+    latencies = sorted(record["latency_s"] for record in records)
+    failed = sum(1 for record in records if record["error"])
+    total_tokens = sum(record["usage"]["total_token_count"] for record in records if record["usage"])
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+    print(
+        f"{len(records)} prompts ({failed} failed) in {elapsed:.2f}s, concurrency={concurrency}; "
+        f"latency p50={statistics.median(latencies) if latencies else 0.0:.2f}s p95={p95:.2f}s; "
+        f"total tokens={total_tokens}",
+        file=sys.stderr,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI coding agent CLI")
+    parser.add_argument("prompt", nargs="?", help="run a single prompt and exit")
+    parser.add_argument("--verbose", action="store_true", help="print token counts and tool results")
+    parser.add_argument("-i", "--interactive", action="store_true", help="start an interactive session")
+    parser.add_argument("--prompts", metavar="FILE", help="JSONL file of prompts to run as a batch")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent prompts in batch mode (default: 4)")
+    parser.add_argument("--output", metavar="FILE", help="batch results JSONL file (default: stdout)")
+    args = parser.parse_args()
+
+    if not (args.prompt or args.interactive or args.prompts):
+        print("I need a prompt")
+        sys.exit()
+
+    load_dotenv()
+    api_key = os.environ.get("GEMINI_API_KEY")
+    replay_cache = cache_from_env()
+    offline = replay_cache is not None and replay_cache.mode == "replay"
+    client = wrap_client(None if offline and not api_key else genai.Client(api_key=api_key), replay_cache)
+
+    if args.prompts:
+        run_batch(client, args.prompts, max(1, args.concurrency), args.output)
+    elif args.interactive:
+        run_repl(client, verbose=args.verbose)
+    else:
+        run_once(client, args.prompt, verbose=args.verbose)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,171 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functions1.get_file_content import read_file_head
+
+TEXT_EXTENSIONS = {
+    ".py", ".txt", ".md", ".rst", ".json", ".jsonl", ".toml", ".cfg", ".ini",
+    ".yaml", ".yml", ".csv", ".js", ".ts", ".tsx", ".jsx", ".html", ".css", ".sh",
+}
+
+
+class Prefetcher:
+    """
+    Speculatively reads small text files after a directory listing.
+
+    Entries are keyed by absolute path and hold the same MAX_CHARS head that
+    get_file_content returns. An entry is only served while the file's mtime
+    and size match what was read, and write_file invalidates it explicitly.
+
+    Args:
+        max_bytes: Total bytes of cached content before LRU eviction
+        max_files: Maximum number of cached files
+        max_file_size: Files larger than this on disk are not prefetched
+        max_per_listing: Maximum files scheduled for one listing
+        workers: Background reader threads
+    """
+
+    def __init__(self, max_bytes=1024 * 1024, max_files=256, max_file_size=64 * 1024,
+                 max_per_listing=32, workers=2):
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_file_size = max_file_size
+        self.max_per_listing = max_per_listing
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # abs_path -> (mtime_ns, size, content)
+        self._pending = set()
+        self._bytes = 0
+        self._generation = {}  # abs_path -> invalidations during an in-flight read
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def after_listing(self, working_directory, directory="."):
+        """Schedule background reads of small text files in a listed directory."""
+        abs_working_dir = os.path.abspath(working_directory)
+        abs_directory = os.path.abspath(os.path.join(working_directory, directory))
+        if not abs_directory.startswith(abs_working_dir):
+            return
+        try:
+            entries = list(os.scandir(abs_directory))
+        except OSError:
+            return
+
+        scheduled = 0
+        for entry in entries:
+            if scheduled >= self.max_per_listing:
+                break
+            if os.path.splitext(entry.name)[1].lower() not in TEXT_EXTENSIONS:
+                continue
+            try:
+                if not entry.is_file() or entry.stat().st_size > self.max_file_size:
+                    continue
+            except OSError:
+                continue
+            with self._lock:
+                if entry.path in self._cache or entry.path in self._pending:
+                    continue
+                self._pending.add(entry.path)
+                generation = self._generation.get(entry.path, 0)
+            self._executor.submit(self._load, entry.path, generation)
+            scheduled += 1
+
+    def _load(self, abs_file_path, generation):
+        try:
+            stat = os.stat(abs_file_path)
+            content = read_file_head(abs_file_path)
+        except (OSError, UnicodeDecodeError):
+            with self._lock:
+                self._pending.discard(abs_file_path)
+                self._generation.pop(abs_file_path, None)
+            return
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._pending.discard(abs_file_path)
+            if self._generation.pop(abs_file_path, 0) != generation:
+                return
+            self._store(abs_file_path, (stat.st_mtime_ns, stat.st_size, content), size)
+            self.prefetched += 1
+
+    def _store(self, abs_file_path, entry, size):
+        self._drop(abs_file_path)
+        self._cache[abs_file_path] = entry
+        self._bytes += size
+        while self._cache and (self._bytes > self.max_bytes or len(self._cache) > self.max_files):
+            oldest = next(iter(self._cache))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, abs_file_path):
+        entry = self._cache.pop(abs_file_path, None)
+        if entry is not None:
+            self._bytes -= len(entry[2].encode("utf-8"))
+
+    def get(self, working_directory, file_path):
+        """
+        Return the cached file head, or None if it was not prefetched or is stale.
+        """
+        abs_file_path = os.path.abspath(os.path.join(working_directory, file_path))
+        if not abs_file_path.startswith(os.path.abspath(working_directory)):
+            return None
+        with self._lock:
+            entry = self._cache.get(abs_file_path)
+        if entry is not None:
+            try:
+                stat = os.stat(abs_file_path)
+            except OSError:
+                stat = None
+            if stat is not None and (stat.st_mtime_ns, stat.st_size) == entry[:2]:
+                with self._lock:
+                    if abs_file_path in self._cache:
+                        self._cache.move_to_end(abs_file_path)
+                    self.hits += 1
+                return entry[2]
+            with self._lock:
+                self._drop(abs_file_path)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def invalidate(self, working_directory, file_path):
+        """Forget a file, including any read of it still in flight."""
+        abs_file_path = os.path.abspath(os.path.join(working_directory, file_path))
+        with self._lock:
+            # Only reads still in flight need the guard, so the map stays as
+            # small as the set of pending reads.
+            if abs_file_path in self._pending:
+                self._generation[abs_file_path] = self._generation.get(abs_file_path, 0) + 1
+            if abs_file_path in self._cache:
+                self._drop(abs_file_path)
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "prefetched": self.prefetched,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "cached_files": len(self._cache),
+                "cached_bytes": self._bytes,
+                "max_files": self.max_files,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def prefetcher_from_env():
+    """Build a Prefetcher when AGENT_PREFETCH=1, reading limits from the environment."""
+    if os.environ.get("AGENT_PREFETCH") != "1":
+        return None
+    return Prefetcher(
+        max_bytes=int(os.environ.get("AGENT_PREFETCH_MAX_BYTES", 1024 * 1024)),
+        max_files=int(os.environ.get("AGENT_PREFETCH_MAX_FILES", 256)),
+        max_file_size=int(os.environ.get("AGENT_PREFETCH_MAX_FILE_SIZE", 64 * 1024)),
+    )
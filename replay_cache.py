@@ -0,0 +1,221 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import contextlib
+import contextvars
+from google.genai import types
+
+MODES = ("passthrough", "record", "replay")
+
+
+class ReplayMiss(Exception):
+    pass
+
+
+# Run-to-run noise in tool results (timings, memory) that must not change the key.
+VOLATILE_PATTERNS = (
+    (re.compile(r"^RESOURCES: .*$", re.MULTILINE), "RESOURCES: <volatile>"),  # run_python_file
+    (re.compile(r"\bwall=\d+(?:\.\d+)?s"), "wall=<volatile>"),  # run_tests
+    (re.compile(r" in \d+(?:\.\d+)?s \("), " in <volatile>s ("),  # run_tests summary
+)
+
+
+WORKING_DIRECTORY_PLACEHOLDER = "<working_directory>"
+
+# Working directory of the conversation being served, masked out of tool
+# results because per-session workspaces give every request a new one.
+_working_directory = contextvars.ContextVar("replay_working_directory", default=None)
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    """Mask ``path`` in tool results when computing cache keys inside this block."""
+    token = _working_directory.set(path)
+    try:
+        yield
+    finally:
+        _working_directory.reset(token)
+
+
+def _normalize(value, directories=()):
+    if isinstance(value, str):
+        for directory in directories:
+            value = value.replace(directory, WORKING_DIRECTORY_PLACEHOLDER)
+        for pattern, replacement in VOLATILE_PATTERNS:
+            value = pattern.sub(replacement, value)
+        return value
+    if isinstance(value, dict):
+        return {key: _normalize(item, directories) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item, directories) for item in value]
+    return value
+
+
+def _content_payload(content, directories):
+    payload = content.model_dump(mode="json", exclude_none=True)
+    for part in payload.get("parts", []):
+        if "function_response" in part:
+            part["function_response"] = _normalize(part["function_response"], directories)
+    return payload
+
+
+def request_key(model, contents, config, working_directory=None):
+    """
+    Content hash of a generate_content request: model, messages, system prompt and tools.
+
+    Timings and resource usage in tool responses are masked first, so a
+    conversation that ran a script or the tests still hits on the next run,
+    and so is ``working_directory``, which differs per session workspace.
+    """
+    directories = ()
+    if working_directory:
+        # Longest first, so a realpath that extends the abspath is not half replaced.
+        directories = sorted({os.path.abspath(working_directory), os.path.realpath(working_directory)},
+                             key=len, reverse=True)
+    payload = {
+        "model": model,
+        "contents": [_content_payload(content, directories) for content in contents],
+        "config": config.model_dump(mode="json", exclude_none=True) if config is not None else None,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ReplayCache:
+    """
+    SQLite-backed store of model responses keyed by request_key.
+
+    Modes:
+        passthrough: always call the model, never read or write the cache
+        record: always call the model and store (or refresh) the response
+        replay: answer only from the cache; a miss raises ReplayMiss, so
+            runs are fully offline
+
+    Entries older than max_age_seconds are ignored and pruned, and the least
+    recently used entries are dropped once the stored responses exceed
+    max_bytes.
+    """
+
+    def __init__(self, path, mode="passthrough", max_bytes=256 * 1024 * 1024,
+                 max_age_seconds=30 * 24 * 3600):
+        if mode not in MODES:
+            raise ValueError(f"Unknown replay mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, size INTEGER, "
+            "created REAL, last_used REAL)"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?", (key, cutoff)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return types.GenerateContentResponse.model_validate_json(row[0])
+
+    def put(self, key, model, response):
+        data = response.model_dump_json(exclude_none=True)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, data, len(data), now, now),
+            )
+            self.recorded += 1
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now):
+        self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.max_age_seconds,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def generate_content(self, models, model, contents, config=None):
+        """Serve a generate_content call according to the cache mode."""
+        if self.mode == "passthrough":
+            return models.generate_content(model=model, contents=contents, config=config)
+        key = request_key(model, contents, config, _working_directory.get())
+        if self.mode == "replay":
+            response = self.get(key)
+            if response is None:
+                raise ReplayMiss(f"No recorded response for request {key[:12]} (replay mode)")
+            return response
+        response = models.generate_content(model=model, contents=contents, config=config)
+        if response is not None:
+            self.put(key, model, response)
+        return response
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses,
+                "recorded": self.recorded, "entries": entries, "bytes": size}
+
+
+class _CachedModels:
+    def __init__(self, models, cache):
+        self._models = models
+        self._cache = cache
+
+    def generate_content(self, model, contents, config=None):
+        return self._cache.generate_content(self._models, model, contents, config)
+
+
+class ReplayClient:
+    """genai.Client stand-in routing models.generate_content through a ReplayCache."""
+
+    def __init__(self, client, cache):
+        self.client = client
+        self.cache = cache
+        self.models = _CachedModels(client.models if client is not None else None, cache)
+
+
+def cache_from_env():
+    """Build a ReplayCache when AGENT_REPLAY_MODE is record or replay, otherwise return None."""
+    mode = os.environ.get("AGENT_REPLAY_MODE", "passthrough")
+    if mode == "passthrough":
+        return None
+    return ReplayCache(
+        os.environ.get("AGENT_REPLAY_CACHE_PATH", ".replay_cache.sqlite3"),
+        mode=mode,
+        max_bytes=int(os.environ.get("AGENT_REPLAY_MAX_BYTES", 256 * 1024 * 1024)),
+        max_age_seconds=int(os.environ.get("AGENT_REPLAY_MAX_AGE_SECONDS", 30 * 24 * 3600)),
+    )
+
+
+def wrap_client(client, cache):
+    """Return client unchanged when cache is None, else a ReplayClient around it."""
+    if cache is None:
+        return client
+    return ReplayClient(client, cache)
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+from prefetch import Prefetcher
+
+
+class TestPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.mkdtemp()
+        self.prefetcher = Prefetcher(max_bytes=1024, max_files=3, workers=1)
+
+    def tearDown(self):
+        self.prefetcher._executor.shutdown(wait=True)
+        shutil.rmtree(self.working_dir)
+
+    def write(self, name, content):
+        with open(os.path.join(self.working_dir, name), "w") as f:
+            f.write(content)
+
+    def prefetch(self):
+        self.prefetcher.after_listing(self.working_dir)
+        self.prefetcher._executor.submit(lambda: None).result()
+
+    def test_serves_prefetched_file(self):
+        self.write("a.py", "print('a')\n")
+        self.prefetch()
+        self.assertEqual(self.prefetcher.get(self.working_dir, "a.py"), "print('a')\n")
+        self.assertEqual(self.prefetcher.stats()["hits"], 1)
+
+    def test_stale_size_is_not_served(self):
+        self.write("a.py", "print('a')\n")
+        self.prefetch()
+        self.write("a.py", "print('a much longer line')\n")
+        self.assertIsNone(self.prefetcher.get(self.working_dir, "a.py"))
+        self.assertEqual(self.prefetcher.stats()["cached_files"], 0)
+
+    def test_stale_mtime_is_not_served(self):
+        self.write("a.py", "print('a')\n")
+        self.prefetch()
+        path = os.path.join(self.working_dir, "a.py")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNone(self.prefetcher.get(self.working_dir, "a.py"))
+
+    def test_invalidate_during_read_discards_result(self):
+        self.write("a.py", "print('a')\n")
+        path = os.path.join(self.working_dir, "a.py")
+        # Simulate a read scheduled by after_listing that finishes after write_file.
+        self.prefetcher._pending.add(path)
+        self.prefetcher.invalidate(self.working_dir, "a.py")
+        self.prefetcher._load(path, 0)
+        self.assertIsNone(self.prefetcher.get(self.working_dir, "a.py"))
+        self.assertEqual(self.prefetcher._generation, {})
+
+    def test_invalidate_removes_cached_entry(self):
+        self.write("a.py", "print('a')\n")
+        self.prefetch()
+        self.prefetcher.invalidate(self.working_dir, "a.py")
+        self.assertIsNone(self.prefetcher.get(self.working_dir, "a.py"))
+        self.assertEqual(self.prefetcher.stats()["invalidations"], 1)
+
+    def test_generation_map_does_not_grow(self):
+        for i in range(50):
+            self.prefetcher.invalidate(self.working_dir, f"file_{i}.py")
+        self.assertEqual(self.prefetcher._generation, {})
+
+    def test_evicts_by_count(self):
+        for name in ("a.py", "b.py", "c.py", "d.py"):
+            self.write(name, "x\n")
+        self.prefetch()
+        stats = self.prefetcher.stats()
+        self.assertEqual(stats["cached_files"], 3)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_evicts_by_bytes(self):
+        self.prefetcher.max_bytes = 600
+        self.write("a.txt", "a" * 400)
+        self.write("b.txt", "b" * 400)
+        self.prefetch()
+        stats = self.prefetcher.stats()
+        self.assertEqual(stats["cached_files"], 1)
+        self.assertEqual(stats["cached_bytes"], 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
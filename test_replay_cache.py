@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+from google.genai import types
+from benchmarks.fake_model import FakeClient, function_call_response, text_response
+from main import run_agent
+from replay_cache import ReplayCache, ReplayMiss, request_key, wrap_client
+from workspaces import WorkspacePool
+
+
+def user_prompt(text):
+    return [types.Content(role="user", parts=[types.Part(text=text)])]
+
+
+class TestReplayCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.working_dir = os.path.join(self.tmp, "project")
+        os.makedirs(self.working_dir)
+        with open(os.path.join(self.working_dir, "hello.py"), "w") as f:
+            f.write("print('hello')\n")
+        self.cache_path = os.path.join(self.tmp, "cache.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def record_then_replay(self, function_name, args, prompt):
+        fake = FakeClient([function_call_response(function_name, args), text_response("Done.")])
+        recorder = ReplayCache(self.cache_path, mode="record")
+        recorded = run_agent(wrap_client(fake, recorder), user_prompt(prompt), self.working_dir)
+        self.assertEqual(recorder.recorded, 2)
+
+        replayer = ReplayCache(self.cache_path, mode="replay")
+        replayed = run_agent(wrap_client(None, replayer), user_prompt(prompt), self.working_dir)
+        self.assertEqual(replayer.stats()["hits"], 2)
+        self.assertEqual(replayed["response"], recorded["response"])
+        self.assertEqual(replayed["function_calls"], [function_name])
+
+    def test_replays_get_files_info_round(self):
+        self.record_then_replay("get_files_info", {"directory": "."}, "List the files")
+
+    def test_replays_run_python_file_round(self):
+        # The tool result carries timings that differ on every run.
+        self.record_then_replay("run_python_file", {"file_path": "hello.py"}, "Run hello.py")
+
+    def test_replays_across_session_workspaces(self):
+        # Every session gets its own directory, and write_file reports absolute paths.
+        pool = WorkspacePool(self.working_dir, os.path.join(self.tmp, "pool"), pool_size=0)
+        script = [function_call_response("write_file", {"file_path": "a.txt", "content": "hi"}),
+                  text_response("Written.")]
+        recorder = ReplayCache(self.cache_path, mode="record")
+        run_agent(wrap_client(FakeClient(script), recorder), user_prompt("Write a.txt"), pool.lease("first"))
+
+        replayer = ReplayCache(self.cache_path, mode="replay")
+        second = pool.lease("second")
+        replayed = run_agent(wrap_client(None, replayer), user_prompt("Write a.txt"), second)
+        self.assertEqual(replayed["response"], "Written.")
+        self.assertEqual(replayer.stats()["hits"], 2)
+        self.assertTrue(os.path.isfile(os.path.join(second, "a.txt")))
+
+    def test_replay_miss_is_reported(self):
+        self.record_then_replay("get_files_info", {"directory": "."}, "List the files")
+        replayer = ReplayCache(self.cache_path, mode="replay")
+        with self.assertRaises(ReplayMiss):
+            run_agent(wrap_client(None, replayer), user_prompt("Something else"), self.working_dir)
+
+    def test_tool_output_changes_the_key(self):
+        self.record_then_replay("run_python_file", {"file_path": "hello.py"}, "Run hello.py")
+        with open(os.path.join(self.working_dir, "hello.py"), "w") as f:
+            f.write("print('goodbye')\n")
+        replayer = ReplayCache(self.cache_path, mode="replay")
+        with self.assertRaises(ReplayMiss):
+            run_agent(wrap_client(None, replayer), user_prompt("Run hello.py"), self.working_dir)
+
+    def test_run_tests_timings_do_not_change_the_key(self):
+        def key(summary):
+            contents = user_prompt("Run the tests") + [types.Content(role="tool", parts=[
+                types.Part.from_function_response(name="run_tests", response={"result": summary})
+            ])]
+            return request_key("model", contents, None)
+
+        first = key("OK: 1 test file(s), 8 passed, 0 failed, 0 errors in 0.01s (all tests)\nwall=0.02s")
+        second = key("OK: 1 test file(s), 8 passed, 0 failed, 0 errors in 0.35s (all tests)\nwall=1.20s")
+        failing = key("FAILED: 1 test file(s), 7 passed, 1 failed, 0 errors in 0.01s (all tests)\nwall=0.02s")
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, failing)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import functions1.run_python_file as run_module
+from functions1.run_python_file import run_python_file
+
+
+class TestRunPythonFile(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.working_dir)
+
+    def write(self, name, source):
+        with open(os.path.join(self.working_dir, name), "w") as f:
+            f.write(source)
+
+    def test_output_and_resources(self):
+        self.write("hello.py", "import sys\nprint('hello')\nprint('oops', file=sys.stderr)\n")
+        result = run_python_file(self.working_dir, "hello.py")
+        self.assertIn("STDOUT:hello", result)
+        self.assertIn("STDERR:oops", result)
+        self.assertIn("RESOURCES: user_cpu=", result)
+
+    def test_non_zero_exit_code(self):
+        self.write("fail.py", "raise SystemExit(3)\n")
+        self.assertIn("error code3", run_python_file(self.working_dir, "fail.py"))
+
+    def test_timeout(self):
+        self.write("sleep.py", "import time\nprint('started', flush=True)\ntime.sleep(30)\n")
+        with mock.patch.object(run_module, "TIMEOUT_SECONDS", 1):
+            start = time.perf_counter()
+            result = run_python_file(self.working_dir, "sleep.py")
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertIn("STDOUT:started", result)
+        self.assertIn("process killed after 1s timeout", result)
+
+    def test_output_limit_kills_process(self):
+        self.write("loop.py", "while True:\n    print('x' * 1000)\n")
+        with mock.patch.dict(run_module.DEFAULT_LIMITS, {"output_bytes": 10_000}):
+            result = run_python_file(self.working_dir, "loop.py")
+        self.assertIn("[...output truncated at 10000 bytes]", result)
+        self.assertIn("exceeding a resource limit (output=10000 bytes)", result)
+        self.assertLess(len(result), 12_000)
+
+    def test_cpu_limit_kills_process(self):
+        self.write("spin.py", "while True:\n    pass\n")
+        with mock.patch.dict(run_module.DEFAULT_LIMITS, {"cpu_seconds": 1}):
+            result = run_python_file(self.working_dir, "spin.py")
+        self.assertIn("exceeding a resource limit (cpu=1s)", result)
+
+    def test_limits_cannot_be_passed_as_tool_arguments(self):
+        self.write("hello.py", "print('hello')\n")
+        with self.assertRaises(TypeError):
+            run_python_file(self.working_dir, "hello.py", limits={"cpu_seconds": 0})
+
+    def test_detached_background_process_does_not_block(self):
+        self.write("detach.py", (
+            "import subprocess, sys\n"
+            "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(15)'], start_new_session=True)\n"
+            "print('ok', flush=True)\n"
+        ))
+        start = time.perf_counter()
+        result = run_python_file(self.working_dir, "detach.py")
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertIn("STDOUT:ok", result)
+        self.assertIn("still holds the output pipes", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import unittest
+import importlib.util
+from unittest import mock
+import functions1.run_tests as run_tests_module
+from functions1.run_tests import TestIndex, TestWorker, forget, mark_changed, run_tests
+
+PASSING_TEST = """import unittest
+from {module} import value
+
+
+class TestValue(unittest.TestCase):
+    def test_value(self):
+        self.assertEqual(value(), 1)
+"""
+
+
+class TestRunTests(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.mkdtemp()
+        self.write("mod.py", "def value():\n    return 1\n")
+        self.write("other.py", "def value():\n    return 1\n")
+        self.write("test_mod.py", PASSING_TEST.format(module="mod"))
+        self.write("test_other.py", PASSING_TEST.format(module="other"))
+
+    def tearDown(self):
+        forget(self.working_dir)
+        shutil.rmtree(self.working_dir)
+
+    def write(self, name, source):
+        with open(os.path.join(self.working_dir, name), "w") as f:
+            f.write(source)
+
+    def test_index_finds_affected_tests(self):
+        self.write("helpers.py", "from mod import value\n")
+        self.write("test_helpers.py", "import unittest\nimport helpers\n")
+        index = TestIndex(self.working_dir)
+        self.assertEqual(index.tests, {"test_mod.py", "test_other.py", "test_helpers.py"})
+        self.assertEqual(index.affected_tests({"mod.py"}), ["test_helpers.py", "test_mod.py"])
+        self.assertEqual(index.affected_tests({"other.py"}), ["test_other.py"])
+
+    def test_first_run_covers_all_tests(self):
+        result = run_tests(self.working_dir)
+        self.assertTrue(result.startswith("OK: 2 test file(s), 2 passed"), result)
+        self.assertIn("(all tests)", result)
+
+    def test_reruns_only_affected_tests(self):
+        run_tests(self.working_dir)
+        self.write("mod.py", "def value():\n    return 2\n")
+        mark_changed(self.working_dir, "mod.py")
+        result = run_tests(self.working_dir)
+        self.assertTrue(result.startswith("FAILED: 1 test file(s), 0 passed, 1 failed"), result)
+        self.assertIn("affected by mod.py", result)
+
+        # Still failing tests are rerun even without further edits.
+        self.assertIn("rerunning previous failures", run_tests(self.working_dir))
+        self.write("mod.py", "def value():\n    return 1\n")
+        mark_changed(self.working_dir, "mod.py")
+        self.assertTrue(run_tests(self.working_dir).startswith("OK: 1 test file(s)"))
+        self.assertIn("No tests affected", run_tests(self.working_dir))
+
+    @unittest.skipIf(importlib.util.find_spec("pytest"), "pytest runs plain test functions")
+    def test_plain_test_functions_without_pytest_are_an_error(self):
+        self.write("test_plain.py", "def test_x():\n    assert 1 == 2\n")
+        result = run_tests(self.working_dir, test_paths=["test_plain.py"])
+        self.assertTrue(result.startswith("FAILED"), result)
+        self.assertIn("pytest is not installed", result)
+
+    def test_timeout_restarts_worker(self):
+        self.write("test_slow.py", "import time\nimport unittest\n\n\nclass T(unittest.TestCase):\n"
+                                   "    def test_sleep(self):\n        time.sleep(30)\n")
+        worker = TestWorker(self.working_dir)
+        try:
+            result = worker.run("test_slow.py", timeout=1)
+            self.assertEqual(result["problems"][0]["message"], "timed out after 1s")
+            self.assertIsNone(worker.process)
+            self.assertEqual(worker.run("test_mod.py")["passed"], 1)
+        finally:
+            worker.stop()
+
+    def test_forget_stops_worker_and_drops_index(self):
+        run_tests(self.working_dir)
+        root = os.path.abspath(self.working_dir)
+        process = run_tests_module._workers[root].process
+        forget(self.working_dir)
+        self.assertIsNotNone(process.poll())
+        self.assertNotIn(root, run_tests_module._indexes)
+        self.assertIn("(all tests)", run_tests(self.working_dir))
+
+    def test_eviction_skips_busy_workers(self):
+        other_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_dir)
+        self.addCleanup(forget, other_dir)
+        with mock.patch.object(run_tests_module, "MAX_WORKERS", 1):
+            busy = run_tests_module._worker_for(self.working_dir)
+            with busy.lock:
+                run_tests_module._worker_for(other_dir)
+                self.assertFalse(busy.retired)
+            run_tests_module._worker_for(other_dir)
+            self.assertTrue(busy.retired)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from workspaces import WorkspacePool, WorkspaceError, QuotaExceeded
+
+
+def wait_for_background():
+    for thread in threading.enumerate():
+        if thread.name in ("workspace-refill", "workspace-recycle"):
+            thread.join()
+
+
+class TestWorkspacePool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.template = os.path.join(self.tmp, "template")
+        os.makedirs(os.path.join(self.template, "pkg"))
+        with open(os.path.join(self.template, "main.py"), "w") as f:
+            f.write("print('hello')\n")
+        with open(os.path.join(self.template, "pkg", "util.py"), "w") as f:
+            f.write("VALUE = 1\n")
+        self.pool = self.make_pool()
+
+    def tearDown(self):
+        wait_for_background()
+        shutil.rmtree(self.tmp)
+
+    def make_pool(self, root="pool", **kwargs):
+        options = {"pool_size": 2, "max_sessions": 4, "quota_bytes": 1024, "idle_seconds": 60}
+        options.update(kwargs)
+        return WorkspacePool(self.template, os.path.join(self.tmp, root), **options)
+
+    def read(self, path, *parts):
+        with open(os.path.join(path, *parts)) as f:
+            return f.read()
+
+    def test_warm_lease(self):
+        path = self.pool.lease("alice")
+        self.assertEqual(self.read(path, "main.py"), "print('hello')\n")
+        self.assertEqual(self.pool.warm_leases, 1)
+        self.assertEqual(self.pool.cold_leases, 0)
+        wait_for_background()
+        self.assertEqual(self.pool.stats()["ready"], 2)
+
+    def test_cold_lease_when_pool_is_empty(self):
+        pool = self.make_pool(root="empty", pool_size=0)
+        path = pool.lease("alice")
+        self.assertEqual(self.read(path, "pkg", "util.py"), "VALUE = 1\n")
+        self.assertEqual(pool.cold_leases, 1)
+
+    def test_same_session_returns_same_workspace(self):
+        first = self.pool.lease("alice")
+        with open(os.path.join(first, "notes.txt"), "w") as f:
+            f.write("kept")
+        second = self.pool.lease("alice")
+        self.assertEqual(first, second)
+        self.assertEqual(self.read(second, "notes.txt"), "kept")
+
+    def test_concurrent_lease_of_same_session(self):
+        paths = []
+        errors = []
+
+        def lease():
+            try:
+                paths.append(self.pool.lease("alice"))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=lease) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(set(paths)), 1)
+        self.assertEqual(self.pool.stats()["leased"], 1)
+
+    def test_workers_sharing_a_pool_never_share_a_clone(self):
+        other_worker = self.make_pool()
+        paths = [self.pool.lease("alice"), other_worker.lease("bob"), self.pool.lease("carol")]
+        self.assertEqual(len(set(paths)), 3)
+        self.assertEqual(other_worker.lease("alice"), paths[0])
+
+    def test_invalid_session_id(self):
+        with self.assertRaises(ValueError):
+            self.pool.lease("../escape")
+
+    def test_max_sessions(self):
+        for i in range(4):
+            self.pool.lease(f"user{i}")
+        with self.assertRaises(WorkspaceError):
+            self.pool.lease("user4")
+        # Existing sessions are still served.
+        self.pool.lease("user0")
+
+    def test_check_quota(self):
+        path = self.pool.lease("alice")
+        self.assertLessEqual(self.pool.check_quota("alice"), 1024)
+        with open(os.path.join(path, "big.bin"), "wb") as f:
+            f.write(b"x" * 2048)
+        with self.assertRaises(QuotaExceeded):
+            self.pool.check_quota("alice")
+
+    def test_release(self):
+        path = self.pool.lease("alice")
+        self.assertTrue(self.pool.release("alice"))
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(self.pool.release("alice"))
+
+    def test_reap_idle(self):
+        idle = self.pool.lease("idle")
+        self.pool.lease("active")
+        old = time.time() - 120
+        os.utime(idle, (old, old))
+        self.assertEqual(self.pool.reap_idle(), ["idle"])
+        self.assertEqual(self.pool.stats()["leased"], 1)
+
+    def test_recycle_resets_ephemeral_workspace(self):
+        path = self.pool.lease("request1", ephemeral=True)
+        with open(os.path.join(path, "main.py"), "w") as f:
+            f.write("print('changed')\n")
+        with open(os.path.join(path, "scratch.py"), "w") as f:
+            f.write("x = 1\n")
+        shutil.rmtree(os.path.join(path, "pkg"))
+        self.assertTrue(self.pool.recycle("request1"))
+        wait_for_background()
+
+        self.assertEqual(self.pool.recycled, 1)
+        stats = self.pool.stats()
+        self.assertEqual((stats["ready"], stats["leased"]), (2, 0))
+        for _ in range(2):
+            path = self.pool.lease("next", ephemeral=True)
+            self.assertEqual(sorted(os.listdir(path)), ["main.py", "pkg"])
+            self.assertEqual(self.read(path, "main.py"), "print('hello')\n")
+            self.assertEqual(self.read(path, "pkg", "util.py"), "VALUE = 1\n")
+            self.pool.recycle("next")
+            wait_for_background()
+
+    def test_ephemeral_lease_does_not_refill(self):
+        wait_for_background()
+        self.pool.lease("request1", ephemeral=True)
+        wait_for_background()
+        self.assertEqual(self.pool.stats()["ready"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
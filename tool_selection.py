@@ -0,0 +1,157 @@
+import os
+import re
+from functools import lru_cache
+from google.genai import types
+from functions1.get_file_info import schema_get_files_info
+from functions1.get_file_content import schema_get_file_content
+from functions1.get_write_file_content import schema_write_file
+from functions1.run_python_file import schema_run_python_file
+from functions1.calculate import schema_calculate
+from functions1.run_tests import schema_run_tests
+
+SYSTEM_PROMPT_HEADER = """
+    You are a helpful AI coding agent.
+
+    When a user asks a question or makes a request, make a function call plan. You can perform the following operations:
+
+"""
+
+SYSTEM_PROMPT_FOOTER = """
+
+    All paths you provide should be relative to the working directory. You do not need to specify the working directory in your function calls as it is automatically injected for security reasons.
+    """
+
+# name -> (declaration, system prompt line, trigger keywords, tools usually needed alongside)
+TOOLS = {
+    "get_files_info": (
+        schema_get_files_info,
+        "List files and directories",
+        {"list", "files", "file", "directory", "directories", "folder", "ls", "tree",
+         "structure", "project", "repo", "repository", "find", "where"},
+        {"get_file_content"},
+    ),
+    "get_file_content": (
+        schema_get_file_content,
+        "read content of the file",
+        {"read", "show", "open", "content", "contents", "view", "look", "inspect",
+         "explain", "print", "cat", "code", "source", "what", "does", "bug"},
+        {"get_files_info"},
+    ),
+    "write_file": (
+        schema_write_file,
+        "write to a file",
+        {"write", "create", "save", "edit", "modify", "change", "update", "fix",
+         "add", "replace", "rename", "refactor", "implement", "append", "delete", "remove"},
+        {"get_file_content", "get_files_info", "run_tests"},
+    ),
+    "run_python_file": (
+        schema_run_python_file,
+        "run a python file with optional arguements",
+        {"run", "execute", "test", "tests", "script", "output", "python", "launch", "start", "check"},
+        {"get_files_info"},
+    ),
+    "run_tests": (
+        schema_run_tests,
+        "run the project's tests (only those affected by your edits are rerun)",
+        {"test", "tests", "testing", "pytest", "unittest", "verify", "check", "passing", "failing", "broken"},
+        {"get_file_content"},
+    ),
+    "calculate": (
+        schema_calculate,
+        "evaluate an arithmetic expression",
+        {"calculate", "calculation", "compute", "evaluate", "math", "arithmetic",
+         "sum", "multiply", "divide", "plus", "minus", "times", "percent"},
+        set(),
+    ),
+}
+
+ALL_TOOLS = tuple(TOOLS)
+
+WORD_PATTERN = re.compile(r"[a-z_]+")
+FILE_PATTERN = re.compile(r"[\w./-]+\.\w+")
+ARITHMETIC_PATTERN = re.compile(r"\d\s*[-+*/%^]\s*\(?\s*\d")
+
+# How many trailing conversation entries count as "recent" tool usage.
+RECENT_CONTENTS = 6
+
+# Offer only the tools a turn is likely to need (AGENT_TOOL_SELECTION=1).
+ENABLED = os.environ.get("AGENT_TOOL_SELECTION") == "1"
+
+
+def build_system_prompt(names):
+    lines = "\n".join(f"    - {TOOLS[name][1]}" for name in names)
+    return SYSTEM_PROMPT_HEADER + lines + SYSTEM_PROMPT_FOOTER
+
+
+@lru_cache(maxsize=None)
+def config_for(names):
+    """
+    Return the GenerateContentConfig offering exactly ``names``.
+
+    ``names`` must be a tuple in ALL_TOOLS order; configs are built once per
+    subset and reused, so the returned object must not be mutated.
+    """
+    return types.GenerateContentConfig(
+        tools=[types.Tool(function_declarations=[TOOLS[name][0] for name in names])],
+        system_instruction=build_system_prompt(names),
+    )
+
+
+def full_config():
+    return config_for(ALL_TOOLS)
+
+
+def _last_user_text(messages):
+    for content in reversed(messages):
+        if content.role == "user" and content.parts:
+            text = " ".join(part.text for part in content.parts if part.text)
+            if text:
+                return text
+    return ""
+
+
+def _recent_tools(messages):
+    used = set()
+    for content in messages[-RECENT_CONTENTS:]:
+        for part in content.parts or []:
+            if part.function_call and part.function_call.name in TOOLS:
+                used.add(part.function_call.name)
+            if part.function_response and part.function_response.name in TOOLS:
+                used.add(part.function_response.name)
+    return used
+
+
+def select_tools(messages):
+    """
+    Pick the tools worth offering for the next model call.
+
+    Keyword hits in the latest user message, tools used in the recent
+    conversation and their usual companions are selected. When nothing
+    matches, every tool is offered so the model is never left without the
+    one it needs.
+
+    Returns:
+        tuple of tool names in ALL_TOOLS order
+    """
+    text = _last_user_text(messages).lower()
+    words = set(WORD_PATTERN.findall(text))
+    selected = {name for name, (_, _, keywords, _) in TOOLS.items() if words & keywords}
+    if FILE_PATTERN.search(text):
+        selected.add("get_file_content")
+        if ".py" in text:
+            selected.add("run_python_file")
+    if ARITHMETIC_PATTERN.search(text):
+        selected.add("calculate")
+    selected |= _recent_tools(messages)
+    if not selected:
+        return ALL_TOOLS
+    for name in list(selected):
+        selected |= TOOLS[name][3]
+    return tuple(name for name in ALL_TOOLS if name in selected)
+
+
+def select_config(messages):
+    """GenerateContentConfig for the next model call (every tool unless ENABLED)."""
+    if not ENABLED:
+        return full_config()
+    return config_for(select_tools(messages))
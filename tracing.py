@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import uuid
+import random
+import threading
+from collections import deque
+
+
+class Span:
+    """
+    A timed operation within a trace, loosely following OpenTelemetry.
+
+    Use as a context manager, or call end() explicitly. Exceptions leaving the
+    ``with`` block mark the span as an error and are re-raised.
+    """
+
+    recording = True
+
+    def __init__(self, tracer, trace, name, parent_id=None, attributes=None):
+        self._tracer = tracer
+        self._trace = trace
+        self.name = name
+        self.trace_id = trace["trace_id"]
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error = None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+
+    def child(self, name, **attributes):
+        return Span(self._tracer, self._trace, name, parent_id=self.span_id, attributes=attributes)
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def end(self, error=None):
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        if error is not None:
+            self.status = "error"
+            self.error = f"{type(error).__name__}: {error}"
+        self._trace["spans"].append(self.to_dict())
+        if self.parent_id is None:
+            self._tracer.export(self._trace)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end(error=exc)
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned for unsampled traces; every operation does nothing."""
+
+    recording = False
+
+    def child(self, name, **attributes):
+        return self
+
+    def set(self, key, value):
+        pass
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Samples traces and keeps finished ones in a ring buffer, optionally
+    appending every span to a JSONL file.
+
+    Args:
+        sample_rate: Fraction of traces recorded, 0.0 to 1.0
+        buffer_size: Number of finished traces kept in memory
+        export_path: JSONL file receiving one line per span, or None
+    """
+
+    def __init__(self, sample_rate=0.0, buffer_size=200, export_path=None):
+        self.sample_rate = sample_rate
+        self.export_path = export_path
+        self._buffer = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+
+    def start_trace(self, name, **attributes):
+        """Start a root span, or return NOOP_SPAN when this trace is not sampled."""
+        if self.sample_rate <= 0.0 or random.random() >= self.sample_rate:
+            return NOOP_SPAN
+        trace = {"trace_id": uuid.uuid4().hex, "spans": []}
+        return Span(self, trace, name, attributes=attributes)
+
+    def export(self, trace):
+        with self._lock:
+            self._buffer.append(trace)
+            if self.export_path:
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    for span in trace["spans"]:
+                        f.write(json.dumps(span, default=str) + "\n")
+
+    def recent(self, limit=None):
+        with self._lock:
+            traces = list(self._buffer)
+        return traces[-limit:] if limit else traces
+
+
+def tracer_from_env():
+    return Tracer(
+        sample_rate=float(os.environ.get("TRACE_SAMPLE_RATE", 0.0)),
+        buffer_size=int(os.environ.get("TRACE_BUFFER_SIZE", 200)),
+        export_path=os.environ.get("TRACE_EXPORT_PATH") or None,
+    )
@@ -0,0 +1,337 @@
+import os
+import re
+import stat
+import sys
+import time
+import uuid
+import shutil
+import tempfile
+import threading
+import subprocess
+
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class WorkspaceError(Exception):
+    pass
+
+
+class QuotaExceeded(WorkspaceError):
+    pass
+
+
+def clone_tree(source, destination):
+    """
+    Copy a directory tree, sharing data blocks where the filesystem allows it.
+
+    Uses reflinks on Linux (btrfs, XFS, ...) and clonefile on macOS, and falls
+    back to a plain copy elsewhere or when cloning is not supported.
+    """
+    if sys.platform.startswith("linux"):
+        command = ["cp", "-a", "--reflink=auto", source, destination]
+    elif sys.platform == "darwin":
+        command = ["cp", "-c", "-R", source, destination]
+    else:
+        command = None
+    if command is not None:
+        if subprocess.run(command, capture_output=True).returncode == 0:
+            return
+        shutil.rmtree(destination, ignore_errors=True)
+    shutil.copytree(source, destination, symlinks=True)
+
+
+def _remove(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.unlink(path)
+
+
+def reset_tree(source, destination, since_ns):
+    """
+    Make destination, a copy of source taken before since_ns, identical to it again.
+
+    Entries whose inode changed after since_ns (by ctime, which scripts cannot
+    set back) or that source does not have are removed and copied again;
+    untouched entries are only stat'ed, so resetting after a short request is
+    much cheaper than a fresh clone. Errors propagate so the caller can fall
+    back to discarding the directory.
+    """
+    def raise_error(error):
+        raise error
+
+    for dirpath, dirnames, filenames in os.walk(destination, onerror=raise_error):
+        source_dir = os.path.normpath(os.path.join(source, os.path.relpath(dirpath, destination)))
+        for name in dirnames + filenames:
+            path = os.path.join(dirpath, name)
+            current = os.lstat(path)
+            try:
+                original = os.lstat(os.path.join(source_dir, name))
+            except FileNotFoundError:
+                original = None
+            if original is not None and stat.S_IFMT(current.st_mode) == stat.S_IFMT(original.st_mode):
+                if stat.S_ISDIR(current.st_mode):
+                    # Entries inside are checked when the walk descends.
+                    if current.st_mode != original.st_mode:
+                        os.chmod(path, original.st_mode)
+                    continue
+                if current.st_ctime_ns < since_ns:
+                    continue
+            _remove(path)
+            if name in dirnames:
+                dirnames.remove(name)
+        for name in os.listdir(source_dir):
+            path = os.path.join(dirpath, name)
+            if os.path.lexists(path):
+                continue
+            source_path = os.path.join(source_dir, name)
+            if os.path.isdir(source_path) and not os.path.islink(source_path):
+                clone_tree(source_path, path)
+            else:
+                shutil.copy2(source_path, path, follow_symlinks=False)
+
+
+def tree_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class WorkspacePool:
+    """
+    Per-session working directories checked out from a template.
+
+    All state lives on the filesystem under ``root`` so several server worker
+    processes can share one pool:
+
+        root/staging/<id>    clones being created
+        root/ready/<id>      pre-created clones waiting to be leased
+        root/sessions/<sid>  leased workspaces, mtime = last use
+        root/trash/<id>      released workspaces being deleted
+
+    Leasing is an atomic rename from ready/ to sessions/, so two workers can
+    never hand out the same clone, and a session's later requests find its
+    workspace whichever worker serves them. Ephemeral leases (one request,
+    no session) are recycled: reset from the template and put back in
+    ready/ rather than discarded and re-cloned.
+
+    Args:
+        template: Directory every workspace starts as a copy of
+        root: Directory holding the pool
+        pool_size: Number of ready clones to keep pre-created
+        max_sessions: Maximum concurrently leased workspaces
+        quota_bytes: Maximum size of one workspace
+        idle_seconds: Leases unused for this long are recycled
+        on_release: Called with a workspace's path when it stops being leased,
+            so per-directory state (e.g. run_tests workers) can be dropped
+    """
+
+    def __init__(self, template, root, pool_size=4, max_sessions=64,
+                 quota_bytes=100 * 1024 * 1024, idle_seconds=3600, on_release=None):
+        self.template = os.path.abspath(template)
+        self.root = os.path.abspath(root)
+        self.pool_size = pool_size
+        self.max_sessions = max_sessions
+        self.quota_bytes = quota_bytes
+        self.idle_seconds = idle_seconds
+        self.on_release = on_release
+        self._dirs = {name: os.path.join(self.root, name) for name in ("staging", "ready", "sessions", "trash")}
+        for path in self._dirs.values():
+            os.makedirs(path, exist_ok=True)
+        self._refill_lock = threading.Lock()
+        self._last_reap = 0.0
+        self._ephemeral = {}  # session_id -> time_ns the ephemeral lease started
+        self.cold_leases = 0
+        self.warm_leases = 0
+        self.recycled = 0
+        self.refill()
+
+    def _session_path(self, session_id):
+        if not SESSION_ID_PATTERN.match(session_id):
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        return os.path.join(self._dirs["sessions"], session_id)
+
+    def _create_ready(self):
+        staging = os.path.join(self._dirs["staging"], uuid.uuid4().hex)
+        clone_tree(self.template, staging)
+        ready = os.path.join(self._dirs["ready"], os.path.basename(staging))
+        os.rename(staging, ready)
+        return ready
+
+    def refill(self):
+        """Top the ready pool back up to pool_size (no-op if another thread is already doing so)."""
+        if not self._refill_lock.acquire(blocking=False):
+            return
+        try:
+            while len(os.listdir(self._dirs["ready"])) < self.pool_size:
+                self._create_ready()
+        finally:
+            self._refill_lock.release()
+
+    def _refill_in_background(self):
+        threading.Thread(target=self.refill, name="workspace-refill", daemon=True).start()
+
+    def lease(self, session_id, ephemeral=False):
+        """
+        Return the session's workspace path, checking out a ready clone on first use.
+
+        An ephemeral lease is handed back with recycle() when its request ends,
+        so it does not trigger a refill of the ready pool.
+        """
+        started_ns = time.time_ns()
+        path = self._checkout(session_id, refill=not ephemeral)
+        if ephemeral:
+            # Anything changed after the checkout started is reset by recycle().
+            self._ephemeral[session_id] = started_ns
+        return path
+
+    def _checkout(self, session_id, refill):
+        path = self._session_path(session_id)
+        self._maybe_reap()
+        if os.path.isdir(path):
+            os.utime(path)
+            return path
+
+        if len(os.listdir(self._dirs["sessions"])) >= self.max_sessions:
+            raise WorkspaceError("No workspaces available: session limit reached")
+
+        for name in os.listdir(self._dirs["ready"]):
+            try:
+                os.rename(os.path.join(self._dirs["ready"], name), path)
+            except FileNotFoundError:
+                continue  # taken by another worker
+            except OSError:
+                if os.path.isdir(path):  # the same session was leased concurrently
+                    return path
+                raise
+            self.warm_leases += 1
+            os.utime(path)
+            if refill:
+                self._refill_in_background()
+            return path
+
+        # Pool exhausted: clone synchronously.
+        self.cold_leases += 1
+        ready = self._create_ready()
+        try:
+            os.rename(ready, path)
+        except OSError:
+            shutil.rmtree(ready, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+        if refill:
+            self._refill_in_background()
+        return path
+
+    def release(self, session_id):
+        """Discard a session's workspace. Returns False if it had none."""
+        path = self._session_path(session_id)
+        trash = os.path.join(self._dirs["trash"], uuid.uuid4().hex)
+        try:
+            os.rename(path, trash)
+        except FileNotFoundError:
+            return False
+        self._released(path)
+        threading.Thread(target=shutil.rmtree, args=(trash, True), daemon=True).start()
+        return True
+
+    def _released(self, path):
+        if self.on_release is not None:
+            self.on_release(path)
+
+    def recycle(self, session_id):
+        """
+        Return an ephemeral lease to the ready pool.
+
+        The workspace leaves sessions/ immediately and is reset from the
+        template in the background; if the pool is already full or the reset
+        fails it is discarded instead.
+        """
+        since_ns = self._ephemeral.pop(session_id, None)
+        if since_ns is None:
+            return self.release(session_id)
+        path = self._session_path(session_id)
+        staging = os.path.join(self._dirs["staging"], uuid.uuid4().hex)
+        try:
+            os.rename(path, staging)
+        except FileNotFoundError:
+            return False
+        self._released(path)
+        # Allow for coarse filesystem timestamps lagging the wall clock.
+        threading.Thread(target=self._reset_into_ready, args=(staging, since_ns - 1_000_000_000),
+                         name="workspace-recycle", daemon=True).start()
+        return True
+
+    def _reset_into_ready(self, staging, since_ns):
+        try:
+            if len(os.listdir(self._dirs["ready"])) >= self.pool_size:
+                raise WorkspaceError("ready pool is full")
+            reset_tree(self.template, staging, since_ns)
+            os.rename(staging, os.path.join(self._dirs["ready"], os.path.basename(staging)))
+            self.recycled += 1
+        except (OSError, WorkspaceError):
+            shutil.rmtree(staging, ignore_errors=True)
+            self.refill()
+
+    def check_quota(self, session_id):
+        """Raise QuotaExceeded if the session's workspace is larger than quota_bytes."""
+        size = tree_size(self._session_path(session_id))
+        if self.quota_bytes and size > self.quota_bytes:
+            raise QuotaExceeded(
+                f"Workspace for session {session_id} uses {size} bytes, quota is {self.quota_bytes}"
+            )
+        return size
+
+    def _maybe_reap(self):
+        now = time.time()
+        if now - self._last_reap < 60:
+            return
+        self._last_reap = now
+        self.reap_idle(now)
+
+    def reap_idle(self, now=None):
+        """Release leases idle for longer than idle_seconds and clear leftover trash."""
+        now = now or time.time()
+        released = []
+        for session_id in os.listdir(self._dirs["sessions"]):
+            try:
+                idle = now - os.stat(os.path.join(self._dirs["sessions"], session_id)).st_mtime
+            except FileNotFoundError:
+                continue
+            if idle > self.idle_seconds and self.release(session_id):
+                released.append(session_id)
+        for name in os.listdir(self._dirs["trash"]):
+            shutil.rmtree(os.path.join(self._dirs["trash"], name), ignore_errors=True)
+        return released
+
+    def stats(self):
+        return {
+            "ready": len(os.listdir(self._dirs["ready"])),
+            "leased": len(os.listdir(self._dirs["sessions"])),
+            "pool_size": self.pool_size,
+            "max_sessions": self.max_sessions,
+            "warm_leases": self.warm_leases,
+            "cold_leases": self.cold_leases,
+            "recycled": self.recycled,
+        }
+
+
+def pool_from_env(on_release=None):
+    """Build a WorkspacePool when AGENT_WORKSPACE_TEMPLATE is set, otherwise return None."""
+    template = os.environ.get("AGENT_WORKSPACE_TEMPLATE")
+    if not template:
+        return None
+    return WorkspacePool(
+        template,
+        os.environ.get("AGENT_WORKSPACE_ROOT", os.path.join(tempfile.gettempdir(), "aiagent-workspaces")),
+        pool_size=int(os.environ.get("AGENT_WORKSPACE_POOL_SIZE", 4)),
+        max_sessions=int(os.environ.get("AGENT_WORKSPACE_MAX_SESSIONS", 64)),
+        quota_bytes=int(os.environ.get("AGENT_WORKSPACE_QUOTA_BYTES", 100 * 1024 * 1024)),
+        idle_seconds=int(os.environ.get("AGENT_WORKSPACE_IDLE_SECONDS", 3600)),
+        on_release=on_release,
+    )